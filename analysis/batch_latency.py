@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class BatchQinModel:
+    """
+    QinModel over a whole taskset at once : the taskset is encoded as arrays (periods, deadlines, basic
+    network latencies, interference adjacency matrix) and the fixed-point iteration runs for every task
+    together, each task leaving the iteration on its own.
+    """
+
+    def __init__(self, noc, taskset):
+        self.noc = noc
+        self.taskset = taskset
+
+        self.ids = np.array([task.id for task in taskset], dtype=np.int64)
+        self.periods = np.array([task.period for task in taskset], dtype=np.int64)
+        self.deadlines = np.array([task.deadline for task in taskset], dtype=np.int64)
+        self.basic_latencies = np.array([task.basic_network_latency(noc) for task in taskset], dtype=np.int64)
+
+        # link id -> positions of the tasks crossing it, as QinModel.link_tasks
+        self.link_tasks = dict()
+        for position, task in enumerate(taskset):
+            for link in task.get_xy_path(noc).ids:
+                if link in self.link_tasks:
+                    self.link_tasks[link].append(position)
+                else:
+                    self.link_tasks[link] = [position]
+
+        # adjacency[m, d] : d directly interferes with m (shared link, d.id >= m.id, d is not m)
+        self.adjacency = np.zeros((len(taskset), len(taskset)), dtype=bool)
+        for positions in self.link_tasks.values():
+            if len(positions) > 1:
+                self.adjacency[np.ix_(positions, positions)] = True
+        self.adjacency &= self.ids[np.newaxis, :] >= self.ids[:, np.newaxis]
+        np.fill_diagonal(self.adjacency, False)
+
+        self.indirect_latencies = self.indirect_latency()
+
+    def indirect_latency(self):
+        # basic latencies summed over the indirect set : the direct interferers of the direct
+        # interferers which are not direct interferers themselves, counted once per path
+        direct = self.adjacency.astype(np.float64)
+        paths = direct @ direct
+        paths[self.adjacency] = 0
+        return np.rint(paths @ self.basic_latencies).astype(np.int64)
+
+    def latency_0th(self):
+        interference = self.adjacency.astype(np.float64) @ (self.basic_latencies + self.indirect_latencies)
+        return self.basic_latencies + np.rint(interference).astype(np.int64)
+
+    def latency_nth(self, iterations=1):
+        # QinModel.latency_nth stops after its first refinement : iterations=1 gives the same results,
+        # iterations=None iterates up to the fixed point or the deadline
+        ri = self.latency_0th()
+        active = ri < self.deadlines
+
+        iteration = 0
+        while active.any() and (iterations is None or iteration < iterations):
+            rows = np.flatnonzero(active)
+
+            windows = np.ceil((ri[rows, np.newaxis] + self.indirect_latencies[np.newaxis, :]) /
+                              self.periods[np.newaxis, :])
+            interference = (windows * self.basic_latencies[np.newaxis, :] * self.adjacency[rows]).sum(axis=1)
+            tmp_ri = self.basic_latencies[rows] + np.rint(interference).astype(np.int64)
+
+            converged = tmp_ri == ri[rows]
+            ri[rows] = tmp_ri
+            active[rows] = ~converged & (tmp_ri < self.deadlines[rows])
+            iteration += 1
+
+        return ri
+
+
+class BatchTDMA:
+    def __init__(self, noc, slot_table):
+        self.noc = noc
+        self.slot_table = slot_table
+
+    def total_slot(self):
+        return sum(self.slot_table)
+
+    def latency(self, taskset, reserved_slot):
+        nbflit = np.array([len(task.packets) * len(task.packets[0].flits) for task in taskset], dtype=np.int64)
+        nbhope = np.array([len(task.get_xy_path(self.noc)) for task in taskset], dtype=np.int64)
+
+        return (nbflit * self.total_slot() / reserved_slot) + nbhope
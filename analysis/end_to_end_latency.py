@@ -51,7 +51,7 @@ class TDMA:
 
     def latency(self, message, reserved_slot):
         nbflit = len(message.packets) * len(message.packets[0].flits)
-        nbhope = len(message.get_xy_path_coordinate(self.noc))
+        nbhope = len(message.get_xy_path(self.noc))
 
         return (nbflit * self.total_slot() / reserved_slot) + nbhope
 
@@ -61,6 +61,34 @@ class QinModel:
         self.taskset = taskset
         self.noc = noc
 
+        # Interference index, built once per taskset
+        self.link_tasks = None  # link id -> tasks crossing it
+        self.rank = dict()  # task -> position in the taskset
+        self.direct_sets = dict()
+        self.indirect_sets = dict()
+        self.basic_latencies = dict()
+        self.indirect_latencies = dict()
+
+    def interference_index_filling(self):
+        self.link_tasks = dict()
+        for position, task in enumerate(self.taskset):
+            self.task_indexing(task, position)
+
+    def task_indexing(self, task, rank):
+        self.rank[task] = rank
+        for link in task.get_xy_path(self.noc).ids:
+            if link in self.link_tasks:
+                self.link_tasks[link].append(task)
+            else:
+                self.link_tasks[link] = [task]
+
+    def link_neighbours(self, message):
+        # tasks sharing at least one link with the message
+        tasks = set()
+        for link in message.get_xy_path(self.noc).ids:
+            tasks.update(self.link_tasks.get(link, ()))
+        return tasks
+
     def task_overlap(self, p1, p2):
         for m in p1:
             for n in p2:
@@ -69,48 +97,70 @@ class QinModel:
         return False
 
     def path_intersection(self, t1, t2):
-        # Getting XY route
-        p1 = t1.get_xy_path_coordinate(self.noc)
-
-        # Getting XY route
-        p2 = t2.get_xy_path_coordinate(self.noc)
-
-        # Testing the overlap (intersection)
-        if self.task_overlap(p1, p2):
-            return True
-        else:
-            return False
+        # Testing the overlap (intersection) of the XY routes
+        return t1.get_xy_path(self.noc).intersects(t2.get_xy_path(self.noc))
 
     def get_link_direction(self, ids):
         # 0 :: left -> right || up -> down
         # 1 :: right -> left || down -> up
         return 0 if ids[0] < ids[1] else 1
 
-    def direct_interference_set(self, message):
-        direct_interference_task = []
+    def direct_set(self, message):
+        # memoized direct interference set, shared : not to be modified
+        if message in self.direct_sets:
+            return self.direct_sets[message]
 
-        for msg in self.taskset:
+        if self.link_tasks is None:
+            self.interference_index_filling()
+
+        # tasks sharing at least one link, in the taskset order
+        direct_interference_task = []
+        for msg in sorted(self.link_neighbours(message), key=self.rank.get):
             if msg == message or msg.id < message.id:
                 continue
+            direct_interference_task.append(msg)
 
-            if self.path_intersection(message, msg):
-                direct_interference_task.append(msg)
-
+        self.direct_sets[message] = direct_interference_task
         return direct_interference_task
 
-    def indirect_interference_set(self, message):
+    def indirect_set(self, message):
+        # memoized indirect interference set, shared : not to be modified
+        if message in self.indirect_sets:
+            return self.indirect_sets[message]
+
         indirect_interference_task = []
 
-        direct_inter_set = self.direct_interference_set(message)
+        direct_inter_set = self.direct_set(message)
+        direct_members = set(direct_inter_set)
 
         for task in direct_inter_set:
-            task_direct_inter_set = self.direct_interference_set(task)
-            for indirect_task in task_direct_inter_set:
-                if indirect_task not in direct_inter_set:
+            for indirect_task in self.direct_set(task):
+                if indirect_task not in direct_members:
                     indirect_interference_task.append(indirect_task)
 
+        self.indirect_sets[message] = indirect_interference_task
         return indirect_interference_task
 
+    def direct_interference_set(self, message):
+        return list(self.direct_set(message))
+
+    def indirect_interference_set(self, message):
+        return list(self.indirect_set(message))
+
+    def basic_latency(self, message):
+        if message not in self.basic_latencies:
+            self.basic_latencies[message] = message.basic_network_latency(self.noc)
+        return self.basic_latencies[message]
+
+    def indirect_latency(self, message):
+        # basic latencies summed over the indirect interference set
+        if message not in self.indirect_latencies:
+            latency = 0
+            for indirect_task in self.indirect_set(message):
+                latency += self.basic_latency(indirect_task)
+            self.indirect_latencies[message] = latency
+        return self.indirect_latencies[message]
+
     def upstream_indirect_interference_set(self, message):
         upstream_set = []
         indirect_inter_set = self.indirect_interference_set(message)
@@ -123,33 +173,27 @@ class QinModel:
         indirect_inter_set = self.indirect_interference_set(message)
 
     def latency_0th(self, message):
-        direct_taskset = self.direct_interference_set(message)
+        direct_taskset = self.direct_set(message)
 
-        latency = message.basic_network_latency(self.noc)
+        latency = self.basic_latency(message)
 
         for task in direct_taskset:
-            indirect_taskset = self.indirect_interference_set(task)
-            latency += task.basic_network_latency(self.noc)
-            for indirect_task in indirect_taskset:
-                latency += indirect_task.basic_network_latency(self.noc)
+            latency += self.basic_latency(task)
+            latency += self.indirect_latency(task)
 
         return latency
 
     def latency_nth(self, message):
-        direct_taskset = self.direct_interference_set(message)
+        direct_taskset = self.direct_set(message)
 
         ri = self.latency_0th(message)
 
         while ri < message.deadline:
-            tmp_ri = message.basic_network_latency(self.noc)
+            tmp_ri = self.basic_latency(message)
             for task in direct_taskset:
-                indirect_taskset = self.indirect_interference_set(task)
+                count = self.indirect_latency(task)
 
-                count = 0
-                for indirect_task in indirect_taskset:
-                    count += indirect_task.basic_network_latency(self.noc)
-
-                tmp_ri += math.ceil((ri + count) / task.period) * task.basic_network_latency(self.noc)
+                tmp_ri += math.ceil((ri + count) / task.period) * self.basic_latency(task)
 
             ri = tmp_ri
 
@@ -157,3 +201,91 @@ class QinModel:
                 break
 
         return ri
+
+
+class IncrementalQinModel(QinModel):
+    """
+    QinModel over a taskset growing and shrinking one task at a time. The response time of a task
+    depends on the tasks within three shared-link hops of it (direct interferers, their direct
+    interferers, and the direct interferers of those), so only this neighbourhood of the added or
+    removed task is analysed again.
+    """
+
+    def __init__(self, noc, taskset=()):
+        QinModel.__init__(self, noc, [])
+        self.link_tasks = dict()
+        self.counter = 0
+        self.response_times = dict()
+        self.deadline_misses = set()
+
+        # the initial taskset is analysed at once
+        for task in taskset:
+            self.taskset.append(task)
+            self.task_indexing(task, self.counter)
+            self.counter += 1
+        self.response_time_update()
+
+    def neighbourhood(self, task, hops):
+        # tasks within `hops` shared-link hops of the task, the task included
+        reached = {task}
+        frontier = [task]
+        for hop in range(hops):
+            next_frontier = []
+            for current in frontier:
+                for neighbour in self.link_neighbours(current):
+                    if neighbour not in reached:
+                        reached.add(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return reached
+
+    def invalidation(self, task):
+        # the sets and latencies depending on the task, before it leaves or after it joins
+        for neighbour in self.neighbourhood(task, 3):
+            self.direct_sets.pop(neighbour, None)
+            self.indirect_sets.pop(neighbour, None)
+            self.indirect_latencies.pop(neighbour, None)
+            self.response_times.pop(neighbour, None)
+
+    def add_task(self, task):
+        self.taskset.append(task)
+        self.task_indexing(task, self.counter)
+        self.counter += 1
+
+        self.invalidation(task)
+        self.response_time_update()
+
+    def remove_task(self, task):
+        self.invalidation(task)
+
+        self.taskset.remove(task)
+        del self.rank[task]
+        for link in task.get_xy_path(self.noc).ids:
+            self.link_tasks[link].remove(task)
+        self.basic_latencies.pop(task, None)
+        self.deadline_misses.discard(task)
+
+        self.response_time_update()
+
+    def response_time_update(self):
+        for task in self.taskset:
+            if task not in self.response_times:
+                self.response_times[task] = self.latency_nth(task)
+                if self.response_times[task] > task.deadline:
+                    self.deadline_misses.add(task)
+                else:
+                    self.deadline_misses.discard(task)
+
+    def response_time(self, task):
+        return self.response_times[task]
+
+    def is_schedulable(self):
+        return len(self.deadline_misses) == 0
+
+    def admission(self, task):
+        # the task joins the taskset only if every task still meets its deadline
+        self.add_task(task)
+        if self.is_schedulable():
+            return True
+        self.remove_task(task)
+        return False
@@ -0,0 +1,373 @@
+import math
+
+import numpy as np
+
+from communication.structure import MessageInstance, PACKET_DEFAULT_SIZE, FLIT_DEFAULT_SIZE
+
+# Ports, in the InPort scan order : an OutPort sends into the opposite InPort of the neighbour router
+PE, NORTH, SOUTH, EAST, WEST = 0, 1, 2, 3, 4
+OPPOSITE = np.array([PE, SOUTH, NORTH, WEST, EAST])
+NB_PORT = 5
+
+FLIT_NUMBER = int(math.ceil(float(PACKET_DEFAULT_SIZE / FLIT_DEFAULT_SIZE)))
+NEVER = np.iinfo(np.int64).max
+
+
+class ArrayNoC:
+    """
+    Cycle-accurate NoC simulation over NumPy arrays : every VC of the mesh is a cell of [router, port, vc]
+    arrays (buffered flits, packet, lock, allotted downstream VC, quantum, outport request), and the routers
+    are stepped together instead of one by one.
+
+    The polling NoC runs its routers by id within a cycle : router (i, j) at cycle t sees its north and west
+    neighbours after their cycle t, and its south and east neighbours after their cycle t - 1. All routers
+    with the same 2t + i + j are thus independent, and each step of the simulation runs one of these
+    wavefronts (a checkerboard of routers, at different cycles), followed by their PEs. The latencies are
+    the ones of Router.rr_arbitration and Router.priority_preemptive_arbitration, flit for flit.
+
+    Message instances get their depart and arrival times only : no flit trace, and no fail-fast.
+    """
+
+    def __init__(self, square_size, nbvc, vc_size, vc_quantum):
+        self.square_size = square_size
+        self.nbvc = nbvc
+        self.vc_size = vc_size
+        self.vc_quantum = vc_quantum
+        self.messages = None
+        self.arbitration = None
+        self.messages_instance = []
+
+        size = square_size * square_size
+        shape = (size, NB_PORT, nbvc)
+        self.row, self.column = np.divmod(np.arange(size), square_size)
+
+        # neighbour router behind each OutPort, -1 on the mesh border
+        router = np.arange(size)
+        self.neighbour = np.full((size, NB_PORT), -1)
+        self.neighbour[:, NORTH] = np.where(self.row > 0, router - square_size, -1)
+        self.neighbour[:, SOUTH] = np.where(self.row < square_size - 1, router + square_size, -1)
+        self.neighbour[:, EAST] = np.where(self.column < square_size - 1, router + 1, -1)
+        self.neighbour[:, WEST] = np.where(self.column > 0, router - 1, -1)
+
+        # VC state
+        self.count = np.zeros(shape, dtype=np.int64)  # buffered flits
+        self.flit = np.zeros(shape, dtype=np.int64)  # id of the head flit in its packet
+        self.instance = np.full(shape, -1, dtype=np.int64)  # message instance of the buffered packet
+        self.packet = np.zeros(shape, dtype=np.int64)  # packet id in its message instance
+        self.outport = np.zeros(shape, dtype=np.int64)  # XY outport of the buffered packet
+        self.timestamp = np.full(shape, -1, dtype=np.int64)  # arrival cycle of the last buffered flit
+        self.lock = np.zeros(shape, dtype=bool)
+        self.next_hop = np.full(shape, -1, dtype=np.int64)  # VC allotted in the downstream InPort
+        self.default_quantum = np.broadcast_to(np.array(vc_quantum[:nbvc], dtype=np.int64), shape)
+        self.quantum = self.default_quantum.copy()
+
+        # outport requests : pending until the next election, then queued (ordered by seq in RR)
+        self.pending = np.zeros(shape, dtype=bool)
+        self.queued = np.zeros(shape, dtype=bool)
+        self.seq = np.zeros(shape, dtype=np.int64)
+
+        self.diagonal = self.row + self.column
+        self.wavefronts = self.wavefront_filling(router)
+
+    def wavefront_filling(self, routers):
+        # routers of each parity of i + j, along their anti-diagonal
+        wavefronts = []
+        for parity in range(2):
+            selected = routers[self.diagonal[routers] % 2 == parity]
+            selected = selected[np.argsort(self.diagonal[selected], kind='stable')]
+            wavefronts.append((selected, self.diagonal[selected]))
+        return wavefronts
+
+    def wavefront(self, wavefronts, step, until):
+        # routers of the step, and their cycle
+        routers, diagonals = wavefronts[step % 2]
+        first = np.searchsorted(diagonals, step - 2 * (until - 1))
+        end = np.searchsorted(diagonals, step - 2, side='right')
+        return routers[first:end], (step - diagonals[first:end]) // 2
+
+    def route(self, routers, destinations):
+        # XY routing : X axe (Column) first, then Y axe (Row)
+        row, column = self.row[routers], self.column[routers]
+        dest_row, dest_column = self.row[destinations], self.column[destinations]
+        vertical = np.where(dest_row < row, NORTH, np.where(dest_row > row, SOUTH, PE))
+        return np.where(dest_column < column, WEST, np.where(dest_column > column, EAST, vertical))
+
+    def instance_filling(self, until):
+        # message instances released before `until`, in the NoC release order (time, position in the taskset)
+        releases = []
+        for index, message in enumerate(self.messages):
+            for time in range(message.offset, until, message.period):
+                releases.append((time, index))
+        releases.sort()
+
+        self.messages_instance = []
+        for time, index in releases:
+            message = self.messages[index]
+            self.messages_instance.append(MessageInstance(message, message.instance_number, allocation=False))
+            message.instance_number += 1
+
+        number = len(releases)
+        release = np.array([time for time, index in releases], dtype=np.int64).reshape(number)
+        source = np.array([self.router_index(self.messages[index].src) for time, index in releases],
+                          dtype=np.int64).reshape(number)
+
+        # PE queues : the instances of every source router, in release order
+        self.queue = np.argsort(source, kind='stable')
+        self.release = release[self.queue]
+        self.queue_start = np.searchsorted(source[self.queue], np.arange(len(self.row)))
+        self.queue_end = np.searchsorted(source[self.queue], np.arange(len(self.row)), side='right')
+        self.cursor = self.queue_start.copy()  # instance at the head of each PE queue
+        self.sent = np.zeros(len(self.row), dtype=np.int64)  # packets of that instance already injected
+
+        # instance settings, by queue position
+        messages = [self.messages[releases[position][1]] for position in self.queue]
+        self.destination = np.array([self.router_index(m.dest) for m in messages], dtype=np.int64).reshape(number)
+        self.priority = np.array([m.priority for m in messages], dtype=np.int64).reshape(number)
+        self.packet_number = np.array([len(m.packets) for m in messages], dtype=np.int64).reshape(number)
+        self.depart = np.full(number, -1, dtype=np.int64)
+        self.arrival = np.full(number, -1, dtype=np.int64)
+
+    def router_index(self, coordinate):
+        return coordinate.i * self.square_size + coordinate.j
+
+    def last_step(self, until):
+        return 2 * (until - 1) + 2 * (self.square_size - 1)
+
+    def run(self, until):
+        # cycles 1 .. until - 1, as env.run(until=until) on the polling NoC
+        self.instance_filling(until)
+        flits = 0
+
+        step = 2
+        while step <= self.last_step(until):
+            routers, times = self.wavefront(self.wavefronts, step, until)
+            flits -= self.router_step(step, routers, times)
+            flits += self.pe_step(routers, times)
+
+            step += 1
+            if flits == 0:
+                step = max(step, self.next_step())
+
+        return self.instance_setting()
+
+    def instance_setting(self):
+        # depart and arrival times of the message instances
+        for position, instance in enumerate(self.queue):
+            message_instance = self.messages_instance[instance]
+            if self.depart[position] >= 0:
+                message_instance.set_depart_time(int(self.depart[position]))
+            if self.arrival[position] >= 0:
+                message_instance.set_arrival_time(int(self.arrival[position]))
+
+        return self.messages_instance
+
+    def next_step(self, routers=None):
+        # empty network : the next wavefront with a PE holding a released instance, among `routers` (all of them)
+        if routers is None:
+            waiting = np.flatnonzero(self.cursor < self.queue_end)
+        else:
+            waiting = routers[self.cursor[routers] < self.queue_end[routers]]
+        if len(waiting) == 0:
+            return NEVER
+        times = np.maximum(self.release[self.cursor[waiting]], 1)
+        return int((2 * times + self.diagonal[waiting]).min())
+
+    def election(self, step, routers):
+        # pending requests join their outport, in the InPort scan order
+        pending = self.pending[routers]
+        if not pending.any():
+            return
+
+        position, port, vc = np.nonzero(pending)
+        router = routers[position]
+        if self.arbitration == 'RR':
+            self.seq[router, port, vc] = step * NB_PORT * self.nbvc + port * self.nbvc + vc
+        self.queued[router, port, vc] = True
+        self.pending[routers] = False
+
+    def priority_filtering(self, candidates, fresh):
+        # Router.get_highest_preemptive_priority_vc drops the VCs holding a flit of this cycle while
+        # iterating over the list it removes them from : the VC following a dropped one is kept anyway
+        rows = np.nonzero((candidates.sum(axis=1) > 1) & (candidates & fresh[:, :, np.newaxis]).any(axis=1))
+        for position, outport in zip(*rows):
+            skip = False
+            for index in np.flatnonzero(candidates[position, :, outport]):
+                if skip:
+                    skip = False
+                elif fresh[position, index]:
+                    candidates[position, index, outport] = False
+                    skip = True
+
+    def router_step(self, step, routers, times):
+        # Router.arbitration of every router of the wavefront : returns the number of ejected flits
+        self.election(step, routers)
+
+        # routers with at least one outport request
+        width = NB_PORT * self.nbvc
+        queued = self.queued[routers].reshape(len(routers), width)
+        busy = queued.any(axis=1)
+        if not busy.any():
+            return 0
+        routers = routers[busy]
+        times = times[busy]
+        queued = queued[busy]
+
+        number = len(routers)
+        outport = self.outport[routers].reshape(number, width)
+        candidates = queued[:, :, np.newaxis] & (outport[:, :, np.newaxis] == np.arange(NB_PORT))
+
+        # a flit buffered in this cycle waits for the next one
+        fresh = (self.count[routers] == 1) & (self.timestamp[routers] == times[:, np.newaxis, np.newaxis])
+        fresh = fresh.reshape(number, width)
+
+        if self.arbitration == 'RR':
+            # head of each outport queue
+            key = np.where(candidates, self.seq[routers].reshape(number, width)[:, :, np.newaxis], NEVER)
+        else:
+            # lowest VC id, then the InPort scan order
+            self.priority_filtering(candidates, fresh)
+            index = np.arange(width)
+            key = np.where(candidates, ((index % self.nbvc) * width + index)[np.newaxis, :, np.newaxis], NEVER)
+
+        elected = key.argmin(axis=1)
+        position, out = np.nonzero(key.min(axis=1) < NEVER)
+        elected = elected[position, out]
+        router = routers[position]
+        time = times[position]
+        port, vc = np.divmod(elected, self.nbvc)
+        src = (router, port, vc)
+
+        moving = ~fresh[position, elected]
+        ejected = 0
+        if (moving & (out == PE)).any():
+            ejected = self.ejection(src, out, time, moving & (out == PE))
+        if (moving & (out != PE)).any():
+            self.forwarding(src, out, time, moving & (out != PE))
+
+        # credit out of every elected VC but the ones holding a flit of this cycle
+        credit = self.quantum[src]
+        self.quantum[src] = np.where(moving & (credit > 0), credit - 1, credit)
+
+        remaining = self.count[src] > 0
+        if self.arbitration == 'RR':
+            # queue head again while credit remains, otherwise queued at the next election
+            stay = (self.quantum[src] > 0) & remaining
+            self.quantum[src] = np.where(stay, self.quantum[src], self.default_quantum[src])
+            self.queued[src] = stay
+            self.pending[src] |= ~stay & remaining
+        else:
+            self.queued[src] = remaining
+
+        return ejected
+
+    def forwarding(self, src, out, time, mask):
+        router, port, vc = (index[mask] for index in src)
+        out = out[mask]
+        time = time[mask]
+        src = (router, port, vc)
+        flit = self.flit[src]
+        neighbour = self.neighbour[router, out]
+        inport = OPPOSITE[out]
+
+        # head flit : idle VC in the next InPort, any in RR, the one of the packet priority otherwise
+        head = flit == 0
+        free = ~self.lock[neighbour, inport]
+        if self.arbitration == 'RR':
+            target = np.where(head, free.argmax(axis=1), self.next_hop[src])
+        else:
+            target = np.where(head, vc, self.next_hop[src])
+        dst = (neighbour, inport, target)
+
+        sent = np.where(head, free[np.arange(len(vc)), target], self.count[dst] < self.vc_size)
+        head = head[sent]
+        tail = flit[sent] == FLIT_NUMBER - 1
+        src = tuple(index[sent] for index in src)
+        dst = tuple(index[sent] for index in dst)
+        flit = flit[sent]
+
+        # downstream VC
+        empty = self.count[dst] == 0
+        self.lock[dst] |= head
+        self.instance[dst] = self.instance[src]
+        self.packet[dst] = self.packet[src]
+        self.outport[dst] = self.route(dst[0], self.destination[self.instance[src]])
+        self.flit[dst] = np.where(empty, flit, self.flit[dst])
+        self.count[dst] += 1
+        self.timestamp[dst] = time[sent]
+        self.pending[dst] |= empty
+
+        # upstream VC : reserved downstream VC from the head flit up to the tail flit
+        self.count[src] -= 1
+        self.flit[src] += 1
+        self.next_hop[src] = np.where(head, dst[2], np.where(tail, -1, self.next_hop[src]))
+        self.lock[src] &= ~tail
+
+    def ejection(self, src, out, time, mask):
+        src = tuple(index[mask] for index in src)
+        time = time[mask]
+        flit = self.flit[src]
+        tail = flit == FLIT_NUMBER - 1
+
+        self.count[src] -= 1
+        self.flit[src] += 1
+        self.lock[src] &= ~tail
+        self.next_hop[src] = np.where(tail, -1, self.next_hop[src])
+
+        # last flit of the last packet
+        instance = self.instance[src]
+        arrived = tail & (self.packet[src] == self.packet_number[instance] - 1)
+        self.arrival[instance[arrived]] = time[arrived] + 1
+
+        return len(flit)
+
+    def pe_step(self, routers, times):
+        # ProcessingEngine.packet_sending of every PE of the wavefront : returns the number of injected flits
+        cursor = self.cursor[routers]
+        ready = cursor < self.queue_end[routers]
+        ready[ready] = self.release[cursor[ready]] <= times[ready]
+        if not ready.any():
+            return 0
+
+        routers = routers[ready]
+        times = times[ready]
+        instance = cursor[ready]
+
+        # a packet enters the router once the previous one has left the PE InPort
+        vcs = (routers[:, np.newaxis], PE, np.arange(self.nbvc)[np.newaxis, :])
+        still = ((self.count[vcs] > 0) & (self.instance[vcs] == instance[:, np.newaxis])).any(axis=1)
+
+        free = ~self.lock[vcs]
+        if self.arbitration == 'RR':
+            vc = free.argmax(axis=1)
+            allotted = free.any(axis=1)
+        elif self.arbitration == 'PRIORITY_PREEMPT':
+            vc = self.priority[instance]
+            allotted = (vc >= 0) & (vc < self.nbvc)
+            vc = np.where(allotted, vc, 0)
+            allotted &= free[np.arange(len(vc)), vc]
+        else:
+            return 0
+
+        injected = allotted & ~still
+        routers = routers[injected]
+        instance = instance[injected]
+        vc = vc[injected]
+        dst = (routers, PE, vc)
+
+        packet = self.sent[routers]
+        self.lock[dst] = True
+        self.instance[dst] = instance
+        self.packet[dst] = packet
+        self.outport[dst] = self.route(routers, self.destination[instance])
+        self.flit[dst] = 0
+        self.count[dst] = min(FLIT_NUMBER, self.vc_size)  # flits over the VC size are lost
+        self.timestamp[dst] = -1
+        self.pending[dst] = True
+
+        self.depart[instance[packet == 0]] = times[injected][packet == 0]
+        packet += 1
+        done = packet == self.packet_number[instance]
+        self.sent[routers] = np.where(done, 0, packet)
+        self.cursor[routers] += done
+
+        return len(routers) * min(FLIT_NUMBER, self.vc_size)
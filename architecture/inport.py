@@ -1,4 +1,14 @@
 from architecture.virtual_channel import VirtualChannel
+from communication.routing import Direction
+
+# Order in which the router scans its InPorts
+SCAN_RANK = {
+    Direction.pe: 0,
+    Direction.north: 1,
+    Direction.south: 2,
+    Direction.east: 3,
+    Direction.west: 4,
+}
 
 
 class InPort:
@@ -12,7 +22,11 @@ class InPort:
 
         # VCs construct
         for i in range(self.nbvc):
-            self.vcs.append(VirtualChannel(i, self.direction, self.router, self.vc_size, self.slot_table[i]))
+            self.vc_append(VirtualChannel(i, self.direction, self.router, self.vc_size, self.slot_table[i]))
+
+    def vc_append(self, vc):
+        vc.order = (SCAN_RANK[self.direction], len(self.vcs))
+        self.vcs.append(vc)
 
     def reset_slot_table(self):
         for vc in self.vcs:
@@ -43,7 +57,7 @@ class InPort:
     def is_packet_still_in_vc(self, packet):
         for vc in self.vcs:
             if len(vc.flits) > 0:
-                if vc.flits[0].packet.message == packet.message:
+                if vc.head().packet.message == packet.message:
                     return True
         return False
 
@@ -54,4 +68,4 @@ class InPort:
 
     def add_more_vcs(self, number, slot):
         for i in range(number):
-            self.vcs.append(VirtualChannel(i, self.direction, self.router, self.vc_size, slot))
+            self.vc_append(VirtualChannel(i, self.direction, self.router, self.vc_size, slot))
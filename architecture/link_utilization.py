@@ -0,0 +1,89 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+# Link directions, in the order of the XY path link ids
+NORTH, SOUTH, EAST, WEST = 0, 1, 2, 3
+
+
+class LinkUtilization(Mapping):
+    """
+    Utilization rate of every link of the mesh, as a dense array : rates[router id - 1, direction]. The
+    flat view is indexed by the link ids of the XY paths, so the rates of a whole path are read or updated
+    at once. It still reads like the former nested dict, keyed by stringified router ids :
+    links['1']['2'] is the rate of the link from router 1 to router 2.
+    """
+
+    def __init__(self, square_size):
+        self.square_size = square_size
+        self.rates = np.zeros((square_size * square_size, 4))
+
+    def link_id(self, src_id, dest_id):
+        # flat index of the link between two neighbour routers
+        difference = dest_id - src_id
+        if difference == -self.square_size:
+            direction = NORTH
+        elif difference == self.square_size:
+            direction = SOUTH
+        elif difference == 1 and src_id % self.square_size != 0:
+            direction = EAST
+        elif difference == -1 and dest_id % self.square_size != 0:
+            direction = WEST
+        else:
+            raise KeyError((src_id, dest_id))
+        return (src_id - 1) * 4 + direction
+
+    def neighbours(self, router_id):
+        # ids of the routers linked to a router
+        i, j = divmod(router_id - 1, self.square_size)
+        neighbours = []
+        if i > 0:
+            neighbours.append(router_id - self.square_size)
+        if i < self.square_size - 1:
+            neighbours.append(router_id + self.square_size)
+        if j < self.square_size - 1:
+            neighbours.append(router_id + 1)
+        if j > 0:
+            neighbours.append(router_id - 1)
+        return neighbours
+
+    def path_rates(self, path):
+        return self.rates.reshape(-1)[np.asarray(path.ids)]
+
+    def add(self, path, utilization):
+        # the links of a path are distinct
+        self.rates.reshape(-1)[np.asarray(path.ids)] += utilization
+
+    def clean(self):
+        self.rates[...] = 0
+
+    def __getitem__(self, key):
+        router_id = int(key)
+        if not 1 <= router_id <= self.square_size * self.square_size:
+            raise KeyError(key)
+        return RouterLinks(self, router_id)
+
+    def __iter__(self):
+        return iter([str(router_id) for router_id in range(1, self.square_size * self.square_size + 1)])
+
+    def __len__(self):
+        return self.square_size * self.square_size
+
+
+class RouterLinks(Mapping):
+    # Links of one router : neighbour id (str) -> utilization rate, writable
+    def __init__(self, links, router_id):
+        self.links = links
+        self.router_id = router_id
+
+    def __getitem__(self, key):
+        return float(self.links.rates.reshape(-1)[self.links.link_id(self.router_id, int(key))])
+
+    def __setitem__(self, key, value):
+        self.links.rates.reshape(-1)[self.links.link_id(self.router_id, int(key))] = value
+
+    def __iter__(self):
+        return iter([str(router_id) for router_id in self.links.neighbours(self.router_id)])
+
+    def __len__(self):
+        return len(self.links.neighbours(self.router_id))
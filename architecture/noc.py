@@ -1,14 +1,26 @@
-from communication.routing import Coordinate, Direction
+import heapq
+
+import simpy
+
+from communication.routing import Coordinate, Direction, Path
 from communication.structure import MessageInstance
+from gen.trace import TraceSet
 from .inport import InPort
+from .link_utilization import LinkUtilization
 from .outport import OutPort
 from .processing_engine import ProcessingEngine
 from .router import Router
 
 
 class NoC:
-    def __init__(self, env, name, square_size, nbvc, vc_size, vc_quantum):
-        self.action = env.process(self.run())
+    def __init__(self, env, name, square_size, nbvc, vc_size, vc_quantum, scheduling='CYCLE'):
+        # CYCLE : every router and PE polls once per cycle
+        # ACTIVITY : only routers holding flits and PEs holding messages are woken up
+        self.scheduling = scheduling
+        if self.scheduling == 'ACTIVITY':
+            self.action = env.process(self.activity_run())
+        else:
+            self.action = env.process(self.run())
         self.env = env
         self.name = name
         self.router_matrix = []
@@ -17,9 +29,24 @@ class NoC:
         self.vc_size = vc_size
         self.vc_quantum = vc_quantum
         self.links = dict()
+        self.path_cache = dict()  # (src.i, src.j, dest.i, dest.j) -> XY Path
         self.messages = None
+        self.release_calendar = None  # heap of the next release of every message
         self.messages_instance = []
         self.arbitration = None
+        self.traceset = None  # per-flit injection and arrival times, see flit_tracing_setting
+
+        # Fail-fast : the simulation stops at the first deadline miss
+        self.fail_fast = False
+        self.deadline_miss = None
+        self.abort = None
+
+        # Activity-driven scheduling
+        self.active_routers = set()
+        self.active_pes = set()
+        self.router_heap = []
+        self.router_heap_ids = set()
+        self.current_router_id = None
 
         # Routers Initialisation
         count = 1
@@ -33,14 +60,21 @@ class NoC:
         # Routers linking
         self.router_linking()
 
+        # XY routing tables
+        self.routing_table_filling()
+
     def router_initialisation(self, env, id, x, y):
 
         # ProcessingEngine
         proc_engine = ProcessingEngine(env)
+        if self.scheduling != 'ACTIVITY':
+            proc_engine.action = env.process(proc_engine.run())
 
         # Routers construct
         coordinate = Coordinate(x, y)
         router = Router(env, id, coordinate, proc_engine)
+        if self.scheduling != 'ACTIVITY':
+            router.action = env.process(router.run())
 
         # InPort
         inNorth = InPort(router, Direction.north, self.nbvc, self.vc_size, self.vc_quantum)
@@ -69,6 +103,9 @@ class NoC:
         return router
 
     def router_linking(self):
+        # cached paths only hold for the current topology
+        self.path_cache.clear()
+
         # Temporary router list
         temporary_list = []
 
@@ -115,51 +152,57 @@ class NoC:
             else:
                 temporary_list[i].outWest.inport_linking(None)
 
-    def link_array_filling(self):
-        # Temporary router list
-        temporary_list = []
-
-        # Matrix Exploration
-        for i in range(self.square_size):
-            for j in range(self.square_size):
-                temporary_list.append(self.router_matrix[i][j])
-
-        # Router Linking
-        for i in range(len(temporary_list)):
-            # Near router IDs
-            id = i
-            idUp = id - self.square_size
-            idRight = id + 1
-            idLeft = id - 1
-            idDown = id + self.square_size
-
-            # router himself
-            router_himself = temporary_list[i]
-            self.links[str(router_himself.id)] = dict()
-
-            # Up Link
-            if idUp >= 0:
-                temporary_router = temporary_list[idUp]
-                # Link Array filling
-                self.links[str(router_himself.id)][str(temporary_router.id)] = 0
+    def routing_table_filling(self):
+        # Each router maps a destination column to its X outport (None on its own column),
+        # then a destination row to its Y outport (the PE on its own row) : O(n) per router
+        size = self.square_size
+        for i in range(size):
+            for j in range(size):
+                router = self.router_matrix[i][j]
+                router.column_table = [router.outWest] * j + [None] + [router.outEast] * (size - j - 1)
+                router.row_table = [router.outNorth] * i + [router.outPE] + [router.outSouth] * (size - i - 1)
+
+    def get_router_id(self, coordinate):
+        return coordinate.i * self.square_size + coordinate.j + 1
+
+    def xy_path(self, src, dest):
+        key = (src.i, src.j, dest.i, dest.j)
+        path = self.path_cache.get(key)
+        if path is None:
+            path = self.xy_path_computation(src, dest)
+            self.path_cache[key] = path
+        return path
+
+    def xy_path_computation(self, src, dest):
+        # X axe (Column) first, then Y axe (Row)
+        # link id : 4 links per router, (router id - 1) * 4 + (0 : North, 1 : South, 2 : East, 3 : West)
+        i, j = src.i, src.j
+        links = []
+        ids = []
+        while True:
+            router_id = i * self.square_size + j + 1
+            if j > dest.j:
+                j -= 1
+                direction = 3
+            elif j < dest.j:
+                j += 1
+                direction = 2
+            elif i > dest.i:
+                i -= 1
+                direction = 0
+            elif i < dest.i:
+                i += 1
+                direction = 1
+            else:
+                break
+            links.append((router_id, i * self.square_size + j + 1))
+            ids.append((router_id - 1) * 4 + direction)
 
-            # Down Link
-            if idDown < self.square_size * self.square_size:
-                temporary_router = temporary_list[idDown]
-                # Link Array filling
-                self.links[str(router_himself.id)][str(temporary_router.id)] = 0
+        return Path(links, ids)
 
-            # Right Link
-            if idRight % self.square_size != 0:
-                temporary_router = temporary_list[idRight]
-                # Link Array filling
-                self.links[str(router_himself.id)][str(temporary_router.id)] = 0
-
-            # Left Link
-            if id % self.square_size != 0:
-                temporary_router = temporary_list[idLeft]
-                # Link Array filling
-                self.links[str(router_himself.id)][str(temporary_router.id)] = 0
+    def link_array_filling(self):
+        # utilization rate of every link, indexed by (router id - 1, direction) like the XY path link ids
+        self.links = LinkUtilization(self.square_size)
 
     def resource_augmentation(self, vc_number, slot):
         # Adding more VCs to ensure deadline-meeting
@@ -172,31 +215,160 @@ class NoC:
                 self.router_matrix[i][j].inPE.add_more_vcs(vc_number, slot)
 
     def link_array_clean(self):
-        for key in self.links.keys():
-            for key2 in self.links[key]:
-                self.links[key][key2] = 0
+        self.links.clean()
 
     def get_router_coordinate_by_id(self, router_id):
-        for i in range(self.square_size):
-            for j in range(self.square_size):
-                if self.router_matrix[i][j].id == router_id:
-                    return self.router_matrix[i][j].coordinate
-        return None
+        # router ids are row-major, from 1
+        if not 1 <= router_id <= self.square_size * self.square_size:
+            return None
+        i, j = divmod(router_id - 1, self.square_size)
+        return self.router_matrix[i][j].coordinate
+
+    def fail_fast_setting(self):
+        # env.run() returns the late message instance as soon as the abort event is processed
+        self.fail_fast = True
+        self.abort = self.env.event()
+        self.abort.callbacks.append(simpy.core.StopSimulation.callback)
+
+    def deadline_monitoring(self, message_instance):
+        # wake up at the absolute deadline, before the routers of that cycle
+        deadline = message_instance.offset + message_instance.deadline + \
+            message_instance.instance * message_instance.period
+        watch = self.env.timeout(max(0, deadline - self.env.now))
+        watch.callbacks.append(lambda event: self.deadline_watch(message_instance))
+
+    def deadline_watch(self, message_instance):
+        # still in flight at its deadline : its arrival can only be late
+        if message_instance.is_deadline_met() is None:
+            self.deadline_missed(message_instance)
+
+    def deadline_check(self, message_instance):
+        if self.fail_fast and not message_instance.is_deadline_met():
+            self.deadline_missed(message_instance)
+
+    def deadline_missed(self, message_instance):
+        if self.deadline_miss is None:
+            self.deadline_miss = message_instance
+            self.abort.succeed(message_instance)
+
+    def flit_tracing_setting(self):
+        # opt-in : every injected flit keeps a trace until the end of the run
+        self.traceset = TraceSet()
+
+    def tracing_setting(self):
+        # logging and flit tracing are set after the NoC is built : read them when the simulation starts
+        for line in self.router_matrix:
+            for router in line:
+                router.tracing_setting()
 
     def run(self):
+        self.tracing_setting()
 
+        # Routers and PEs poll every cycle on their own : the NoC only wakes up at release instants
         while True:
-            for message in self.messages:
-                coord = message.src
-                router = self.router_matrix[coord.i][coord.j]
+            self.message_release()
+
+            next_time = self.next_release()
+            if next_time is None:
+                return
+            yield self.env.timeout(next_time - self.env.now)
+
+    def release_calendar_filling(self):
+        # (release time, position in the taskset, message) : first release at the offset
+        self.release_calendar = []
+        for index, message in enumerate(self.messages):
+            self.release_calendar.append((message.offset, index, message))
+        heapq.heapify(self.release_calendar)
+
+    def message_release(self):
+        if self.release_calendar is None:
+            self.release_calendar_filling()
+
+        while len(self.release_calendar) > 0 and self.release_calendar[0][0] <= self.env.now:
+            time, index, message = heapq.heappop(self.release_calendar)
+            heapq.heappush(self.release_calendar, (time + message.period, index, message))
+
+            coord = message.src
+            router = self.router_matrix[coord.i][coord.j]
+
+            mi = MessageInstance(message, message.instance_number)
+            message.instance_number += 1
+            self.messages_instance.append(mi)
+            router.proc_engine.send_to_router(mi)
+            if self.fail_fast:
+                self.deadline_monitoring(mi)
+            self.pe_activation(router.proc_engine)
+
+    def next_release(self):
+        if len(self.release_calendar) == 0:
+            return None
+        return self.release_calendar[0][0]
+
+    def activity_run(self):
+        # Same cycle order as the polling mode (release, routers by id, PEs by id),
+        # but idle routers and PEs are skipped and idle cycles are jumped over
+        self.tracing_setting()
 
-                if self.env.now % message.period == 0:
-                    mi = MessageInstance(message, message.instance_number)
-                    message.instance_number += 1
-                    self.messages_instance.append(mi)
-                    router.proc_engine.send_to_router(mi)
+        while True:
+            self.message_release()
 
-            yield self.env.timeout(1)
+            # Routers and PEs start working at cycle 1
+            if self.env.now > 0:
+                self.router_pass()
+                self.pe_pass()
+
+            if len(self.active_routers) > 0 or len(self.active_pes) > 0:
+                yield self.env.timeout(1)
+            else:
+                next_time = self.next_release()
+                if next_time is None:
+                    return
+                yield self.env.timeout(next_time - self.env.now)
+
+    def router_pass(self):
+        for router in self.active_routers:
+            heapq.heappush(self.router_heap, (router.id, router))
+            self.router_heap_ids.add(router.id)
+        self.active_routers = set()
+
+        while len(self.router_heap) > 0:
+            router_id, router = heapq.heappop(self.router_heap)
+            self.current_router_id = router_id
+
+            router.arbitration()
+
+            if not router.is_idle():
+                self.active_routers.add(router)
+
+        self.router_heap_ids.clear()
+        self.current_router_id = None
+
+    def pe_pass(self):
+        proc_engines = sorted(self.active_pes, key=lambda pe: pe.router.id)
+        self.active_pes = set()
+
+        for proc_engine in proc_engines:
+            proc_engine.packet_sending()
+
+            if not proc_engine.is_idle():
+                self.active_pes.add(proc_engine)
+
+    def router_activation(self, router):
+        # Called each time a flit is buffered into one of the router VCs
+        if self.scheduling != 'ACTIVITY':
+            return
+
+        # A router further in the current pass still has its turn in this cycle
+        if self.current_router_id is not None and router.id > self.current_router_id:
+            if router.id not in self.router_heap_ids:
+                heapq.heappush(self.router_heap, (router.id, router))
+                self.router_heap_ids.add(router.id)
+        else:
+            self.active_routers.add(router)
+
+    def pe_activation(self, proc_engine):
+        if self.scheduling == 'ACTIVITY':
+            self.active_pes.add(proc_engine)
 
     def __str__(self):
         string = ''
@@ -0,0 +1,160 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .array_noc import ArrayNoC
+
+# Arrays written during a run : VC state, PE queues, instance times and the tile exchanges
+SHARED = ('count', 'flit', 'instance', 'packet', 'outport', 'timestamp', 'lock', 'next_hop', 'quantum', 'pending',
+          'queued', 'seq', 'cursor', 'sent', 'depart', 'arrival', 'tile_state', 'tile_span')
+# Columns of tile_state
+FLITS, NEXT_STEP, STEP_TIME = 0, 1, 2
+
+
+def tile_simulation(noc, tile, until, barrier):
+    try:
+        noc.tile_run(tile, until, barrier)
+    finally:
+        noc.detach()
+
+
+class PartitionedNoC(ArrayNoC):
+    """
+    ArrayNoC whose mesh is cut into rectangular tiles of routers, each one simulated by its own process.
+
+    During a run the simulation state lives in shared memory. Within a step, a router reads the VCs of its
+    neighbours (all of them on the other wavefront) and writes into their InPorts only, so the tiles work on
+    the same arrays, and the flits and VC states crossing a cut are exchanged through them : the one link
+    delay between two wavefronts is the lookahead, and the tiles only wait for each other at the end of a step.
+
+    `span` is the sum over the steps of the time of the slowest tile, i.e. the run time given a core per tile.
+    """
+
+    def __init__(self, square_size, nbvc, vc_size, vc_quantum, tiles=(2, 2)):
+        ArrayNoC.__init__(self, square_size, nbvc, vc_size, vc_quantum)
+        self.tiles = tuple(tiles)
+        self.blocks = []  # (attribute, shared memory) of the state, during a run
+        self.span = 0
+
+    def __getstate__(self):
+        # spawned tiles attach to the shared state instead of copying it
+        state = dict(self.__dict__)
+        for name, memory in self.blocks:
+            state[name] = ('shared', memory.name, state[name].shape, state[name].dtype.str)
+        state['blocks'] = []
+        state['messages'] = None
+        state['messages_instance'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in SHARED:
+            value = state.get(name)
+            if isinstance(value, tuple) and len(value) == 4 and value[0] == 'shared':
+                memory = shared_memory.SharedMemory(name=value[1])
+                self.blocks.append((name, memory))
+                setattr(self, name, np.ndarray(value[2], dtype=np.dtype(value[3]), buffer=memory.buf))
+
+    def tile_routers(self, tile):
+        # routers of a tile : bands of rows times bands of columns
+        rows, columns = self.tiles
+        band = (self.row * rows // self.square_size) * columns + self.column * columns // self.square_size
+        return np.flatnonzero(band == tile)
+
+    def run(self, until):
+        # tiles cannot be spawned from a daemonic process (a runner pool worker) : a single process is used
+        if multiprocessing.current_process().daemon:
+            return ArrayNoC.run(self, until)
+
+        number = self.tiles[0] * self.tiles[1]
+        barrier = multiprocessing.Barrier(number)
+        try:
+            self.instance_filling(until)
+            # the state of every tile after a step, on alternate rows
+            self.tile_state = np.zeros((2, number, 3), dtype=np.int64)
+            self.tile_span = np.zeros(1, dtype=np.int64)
+            self.memory_sharing()
+
+            processes = [multiprocessing.Process(target=tile_simulation, args=(self, tile, until, barrier))
+                         for tile in range(number)]
+            for process in processes:
+                process.start()
+
+            # a failing tile would leave the others waiting at the barrier
+            running = list(processes)
+            while len(running) > 0:
+                running[0].join(timeout=0.1)
+                for process in list(running):
+                    if process.exitcode is None:
+                        continue
+                    running.remove(process)
+                    if process.exitcode != 0:
+                        barrier.abort()
+                        for other in running:
+                            other.join()
+                        raise RuntimeError('Tile simulation failed (exit code %d)' % process.exitcode)
+
+            self.span = int(self.tile_span[0]) / 1e9
+            return self.instance_setting()
+        finally:
+            self.memory_release()
+
+    def tile_run(self, tile, until, barrier):
+        routers = self.tile_routers(tile)
+        wavefronts = self.wavefront_filling(routers)
+        flits = 0
+
+        step = 2
+        turn = 0
+        while step <= self.last_step(until):
+            start = time.perf_counter_ns()
+            active, times = self.wavefront(wavefronts, step, until)
+            flits -= self.router_step(step, active, times)
+            flits += self.pe_step(active, times)
+
+            # a row is not written again before every tile has read it : one barrier per step. The flits of a
+            # tile may leave through another one, only their sum tells an empty network
+            state = self.tile_state[turn % 2]
+            state[tile, FLITS] = flits
+            state[tile, NEXT_STEP] = self.next_step(routers)
+            state[tile, STEP_TIME] = time.perf_counter_ns() - start
+            barrier.wait()
+
+            if tile == 0:
+                self.tile_span[0] += state[:, STEP_TIME].max()
+
+            step += 1
+            if state[:, FLITS].sum() == 0:
+                # empty network : every tile jumps to the same step
+                step = max(step, int(state[:, NEXT_STEP].min()))
+            turn += 1
+
+    def memory_sharing(self):
+        # the state is moved to shared memory, where the tiles work on it
+        for name in SHARED:
+            array = getattr(self, name)
+            memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.blocks.append((name, memory))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+            shared[...] = array
+            setattr(self, name, shared)
+
+    def detach(self):
+        # the arrays must not outlive the shared memory they are built on
+        memories = [memory for name, memory in self.blocks]
+        for name, memory in self.blocks:
+            setattr(self, name, None)
+        self.blocks = []
+        for memory in memories:
+            memory.close()
+
+    def memory_release(self):
+        # the state is copied out of the shared memory, which is then freed
+        for name, memory in self.blocks:
+            setattr(self, name, getattr(self, name).copy())
+        for name, memory in self.blocks:
+            memory.close()
+            memory.unlink()
+        self.blocks = []
@@ -1,12 +1,13 @@
 import logging
 import time
 
+from communication.structure import FlitType
+
 
 class ProcessingEngine:
     def __init__(self, env):
-        self.action = env.process(self.run())
         self.env = env
-        self.flit_arr_queue = []
+        self.nb_received_flits = 0
         self.packets = None
         self.sending_queue = []
         self.initial_delay = 0
@@ -21,7 +22,11 @@ class ProcessingEngine:
         self.sending_queue.append(message_instance)
 
     def flit_receiving(self, flit):
-        self.flit_arr_queue.append(flit)
+        self.nb_received_flits += 1
+
+        # the whole packet is delivered : its flits go back to the message pool
+        if flit.type == FlitType.tail:
+            flit.packet.message.template.recycle_packet(flit.packet)
 
     def run(self):
         yield self.env.timeout(self.initial_delay)
@@ -29,18 +34,24 @@ class ProcessingEngine:
         while True:
             yield self.env.timeout(1)
 
-            if len(self.sending_queue) > 0:
-                message = self.sending_queue.pop(0)
+            self.packet_sending()
+
+    def packet_sending(self):
+        if len(self.sending_queue) > 0:
+            message = self.sending_queue.pop(0)
+
+            packets = message.packets
 
-                packets = message.packets
+            packet = packets.pop(0)
 
-                packet = packets.pop(0)
+            if not self.router.receiving_from_pe(packet):
+                message.packets.insert(0, packet)
 
-                if not self.router.receiving_from_pe(packet):
-                    message.packets.insert(0, packet)
+            if len(message.packets) > 0:
+                self.sending_queue.insert(0, message)
 
-                if len(message.packets) > 0:
-                    self.sending_queue.insert(0, message)
+    def is_idle(self):
+        return len(self.sending_queue) == 0
 
     def __str__(self):
         return 'ProcessingEngine (%d,%d)' % (self.router.coordinate.i, self.router.coordinate.j)
@@ -0,0 +1,42 @@
+from collections import deque
+
+
+class RequestQueue:
+    # VCs requesting an outport, in arbitration order, with O(1) membership test
+    def __init__(self):
+        self.vcs = deque()
+        self.members = set()
+
+    def append(self, vc):
+        self.vcs.append(vc)
+        self.members.add(vc)
+
+    def appendleft(self, vc):
+        self.vcs.appendleft(vc)
+        self.members.add(vc)
+
+    def popleft(self):
+        vc = self.vcs.popleft()
+        self.members.discard(vc)
+        return vc
+
+    def remove(self, vc):
+        self.vcs.remove(vc)
+        self.members.discard(vc)
+
+    def clear(self):
+        self.vcs.clear()
+        self.members.clear()
+
+    def sorted_vcs(self):
+        # requesting VCs in the InPort scan order (PE, North, South, East, West)
+        return sorted(self.vcs, key=lambda vc: vc.order)
+
+    def __contains__(self, vc):
+        return vc in self.members
+
+    def __len__(self):
+        return len(self.vcs)
+
+    def __iter__(self):
+        return iter(self.vcs)
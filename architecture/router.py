@@ -4,27 +4,29 @@ import logging
 import math
 import time
 
-from communication.structure import NodeArray, FlitType, Node, PACKET_DEFAULT_SIZE, FLIT_DEFAULT_SIZE
-from engine.simulation import TRACESET
+from communication.structure import FlitType, PACKET_DEFAULT_SIZE, FLIT_DEFAULT_SIZE
+from .request_queue import RequestQueue
 
 
 class Router:
     def __init__(self, env, id, coordinate, proc_engine):
-        self.action = env.process(self.run())
         self.env = env
         self.id = id
         self.coordinate = coordinate
         self.proc_engine = proc_engine
         self.logger = logging.getLogger(' ')
         self.noc = None
+        self.tracing_setting()
+        self.column_table = None
+        self.row_table = None
 
         # Process Attribute
-        self.vcs_dictionary = NodeArray()
-        self.vcs_target_north = []
-        self.vcs_target_south = []
-        self.vcs_target_east = []
-        self.vcs_target_west = []
-        self.vcs_target_pe = []
+        self.vcs_pending = set()  # non-empty VCs waiting to join their outport queue
+        self.vcs_target_north = RequestQueue()
+        self.vcs_target_south = RequestQueue()
+        self.vcs_target_east = RequestQueue()
+        self.vcs_target_west = RequestQueue()
+        self.vcs_target_pe = RequestQueue()
         self.pipelined_sending = []
 
     def inport_setting(self, inNorth, inSouth, inEast, inWest):
@@ -46,34 +48,53 @@ class Router:
     def noc_settings(self, noc):
         self.noc = noc
 
+    def tracing_setting(self):
+        # the logging level is checked once, not on every flit hop
+        self.trace_info = self.logger.isEnabledFor(logging.INFO)
+        self.trace_debug = self.logger.isEnabledFor(logging.DEBUG)
+        self.trace_flits = self.noc is not None and self.noc.traceset is not None
+
     def run(self):
         while True:
             yield self.env.timeout(1)
 
-            if self.noc.arbitration == "RR":
-                self.rr_arbitration()
+            self.arbitration()
 
-            elif self.noc.arbitration == "PRIORITY_PREEMPT":
-                self.priority_preemptive_arbitration()
+    def arbitration(self):
+        if self.noc.arbitration == "RR":
+            self.rr_arbitration()
+
+        elif self.noc.arbitration == "PRIORITY_PREEMPT":
+            self.priority_preemptive_arbitration()
+
+    def is_idle(self):
+        # every non-empty VC is either pending or queued on its outport
+        return len(self.vcs_pending) == 0 and \
+            len(self.vcs_target_north) == 0 and \
+            len(self.vcs_target_south) == 0 and \
+            len(self.vcs_target_east) == 0 and \
+            len(self.vcs_target_west) == 0 and \
+            len(self.vcs_target_pe) == 0
+
+    def vc_request(self, vc):
+        # A VC of this router received its first flit
+        self.vcs_pending.add(vc)
+        self.noc.router_activation(self)
+
+    def vc_election(self):
+        # New requests join their outport queue in the InPort scan order (PE, North, South, East, West)
+        if len(self.vcs_pending) > 0:
+            for vc in sorted(self.vcs_pending, key=lambda vc: vc.order):
+                self.vc_target_outport(vc)
+            self.vcs_pending.clear()
 
     def route_computation(self, flit):
-        # On X axe (Column)
-        # By the West
-        if self.coordinate.j > flit.destination.j:
-            return self.outWest
-        # By the East
-        elif self.coordinate.j < flit.destination.j:
-            return self.outEast
-        # On Y axe (Row)
-        else:
-            if self.coordinate.i > flit.destination.i:
-                return self.outNorth
-            # By the East
-            elif self.coordinate.i < flit.destination.i:
-                return self.outSouth
-            else:
-                # Destination Reached
-                return self.outPE
+        # XY routing, precomputed by the NoC : X axe (Column) first, then Y axe (Row)
+        destination = flit.destination
+        outport = self.column_table[destination.j]
+        if outport is None:
+            outport = self.row_table[destination.i]
+        return outport
 
     def is_packet_still_in_vc(self, packet):
         if self.inPE.is_packet_still_in_vc(packet) or \
@@ -99,8 +120,11 @@ class Router:
         if requested_vc is not None:
             for flit in packet.flits:
                 requested_vc.enqueue(flit)
-                self.logger.info(
-                    '(%d) : %s - %s -> %s -> %s' % (self.env.now, flit, self.proc_engine, requested_vc, self))
+                if self.trace_flits:
+                    self.noc.traceset.set_flit_injection(flit, self.env.now)
+                if self.trace_info:
+                    self.logger.info(
+                        '(%d) : %s - %s -> %s -> %s', self.env.now, flit, self.proc_engine, requested_vc, self)
 
                 # set depart time for the first first in the first packet
                 if flit.id == 0 and flit.packet.id == 0:
@@ -113,25 +137,21 @@ class Router:
     def vc_target_outport(self, vc):
 
         if len(vc.flits) > 0:
-            if self.route_computation(vc.flits[0]) == self.outNorth \
-                    and vc not in self.vcs_target_north:
-                self.vcs_target_north.append(vc)
-
-            elif self.route_computation(vc.flits[0]) == self.outSouth \
-                    and vc not in self.vcs_target_south:
-                self.vcs_target_south.append(vc)
-
-            elif self.route_computation(vc.flits[0]) == self.outEast \
-                    and vc not in self.vcs_target_east:
-                self.vcs_target_east.append(vc)
-
-            elif self.route_computation(vc.flits[0]) == self.outWest \
-                    and vc not in self.vcs_target_west:
-                self.vcs_target_west.append(vc)
+            outport = self.route_computation(vc.head())
+
+            if outport == self.outNorth:
+                vcs_target = self.vcs_target_north
+            elif outport == self.outSouth:
+                vcs_target = self.vcs_target_south
+            elif outport == self.outEast:
+                vcs_target = self.vcs_target_east
+            elif outport == self.outWest:
+                vcs_target = self.vcs_target_west
+            else:
+                vcs_target = self.vcs_target_pe
 
-            elif self.route_computation(vc.flits[0]) == self.outPE \
-                    and vc not in self.vcs_target_pe:
-                self.vcs_target_pe.append(vc)
+            if vc not in vcs_target:
+                vcs_target.append(vc)
 
     def arrived_flit(self, vc):
         flit = vc.dequeue()
@@ -144,7 +164,7 @@ class Router:
         flit.timestamp = copy.copy(self.env.now)
 
         if flit.type == FlitType.tail:
-            self.vcs_dictionary.remove(vc)
+            vc.next_hop = None
             vc.release()
 
         vc.credit_out()
@@ -152,7 +172,8 @@ class Router:
         # Flit store
         self.proc_engine.flit_receiving(flit)
 
-        TRACESET.set_flit_arrival(flit.packet.message, self.env.now)
+        if self.trace_flits:
+            self.noc.traceset.set_flit_arrival(flit, self.env.now)
 
         # set arrival time to the last flit into the message
         nb_flit = PACKET_DEFAULT_SIZE / FLIT_DEFAULT_SIZE
@@ -160,8 +181,10 @@ class Router:
 
         if flit.id == nb_flit - 1 and flit.packet.id == nb_packet - 1:
             flit.packet.message.set_arrival_time(self.env.now + 1)
+            self.noc.deadline_check(flit.packet.message)
 
-        self.logger.info('(%d) : %s - %s -> %s' % (self.env.now, flit, self, self.proc_engine))
+        if self.trace_info:
+            self.logger.info('(%d) : %s - %s -> %s', self.env.now, flit, self, self.proc_engine)
 
     def send_flit(self, vc, outport):
 
@@ -185,82 +208,78 @@ class Router:
                 vc_allotted = None
 
             if vc_allotted is not None:
-                self.logger.debug('(%d) - VC (%s) allotted' % (self.env.now, vc_allotted))
+                if self.trace_debug:
+                    self.logger.debug('(%d) - VC (%s) allotted', self.env.now, vc_allotted)
                 vc_allotted.enqueue(flit)
                 flit.timestamp = copy.copy(self.env.now)
-                self.logger.info(
-                    '(%d) : %s ON %s- %s -> %s -> %s' % (self.env.now, flit, vc, self, vc_allotted, vc_allotted.router))
+                if self.trace_info:
+                    self.logger.info(
+                        '(%d) : %s ON %s- %s -> %s -> %s', self.env.now, flit, vc, self, vc_allotted, vc_allotted.router)
                 # vc.credit_out()
 
-                # registering VC allotted in dictionary
-                self.vcs_dictionary.add(Node(vc, vc_allotted))
+                # wormhole reservation, held until the tail flit leaves
+                vc.next_hop = vc_allotted
 
             else:  # No idle VC
                 vc.restore(flit)  # restore
-                self.logger.debug('(%d) - %s was not sent - VC not allotted ON %s' %
-                                  (self.env.now, flit, outport.inPort.router))
+                if self.trace_debug:
+                    self.logger.debug(
+                        '(%d) - %s was not sent - VC not allotted ON %s', self.env.now, flit, outport.inPort.router)
                 # outport.inPort.vcs_status()
                 # time.sleep(1)
 
         # if is a Body Flit
         elif flit.type == FlitType.body:
             # Getting the alloted vc
-            vc_allotted = self.vcs_dictionary.get_target(vc)
-            self.logger.debug('(%d) - Retreiving allotted VC (%s)' % (self.env.now, vc_allotted))
+            vc_allotted = vc.next_hop
+            if self.trace_debug:
+                self.logger.debug('(%d) - Retreiving allotted VC (%s)', self.env.now, vc_allotted)
 
             # Sending to the next router
             sent = vc_allotted.enqueue(flit)
 
             if not sent:  # No Place
                 vc.restore(flit)  # restore
-                self.logger.debug('(%d) - %s was not sent - No Place in VC (%s)' % (self.env.now, flit, vc_allotted))
+                if self.trace_debug:
+                    self.logger.debug('(%d) - %s was not sent - No Place in VC (%s)', self.env.now, flit, vc_allotted)
             else:
-                self.logger.info(
-                    '(%d) : %s ON %s- %s -> %s -> %s' % (self.env.now, flit, vc, self, vc_allotted, vc_allotted.router))
+                if self.trace_info:
+                    self.logger.info(
+                        '(%d) : %s ON %s- %s -> %s -> %s', self.env.now, flit, vc, self, vc_allotted, vc_allotted.router)
                 # vc.credit_out()
                 flit.timestamp = copy.copy(self.env.now)
 
         # if is a Tail Flit
         elif flit.type == FlitType.tail:
             # Getting the alloted vc
-            vc_allotted = self.vcs_dictionary.get_target(vc)
+            vc_allotted = vc.next_hop
 
             # Sending to the next router
             sent = vc_allotted.enqueue(flit)
 
             if not sent:  # No Place
                 vc.restore(flit)  # restore
-                self.logger.debug('(%d) - %s was not sent - No Place in VC (%s)' % (self.env.now, flit, vc_allotted))
+                if self.trace_debug:
+                    self.logger.debug('(%d) - %s was not sent - No Place in VC (%s)', self.env.now, flit, vc_allotted)
             else:
-                self.vcs_dictionary.remove(vc)
+                vc.next_hop = None
                 flit.timestamp = copy.copy(self.env.now)
                 # vc.credit_out()
                 vc.release()
-                self.logger.debug('(%d) - VC (%s) - released' % (self.env.now, vc))
+                if self.trace_debug:
+                    self.logger.debug('(%d) - VC (%s) - released', self.env.now, vc)
 
         vc.credit_out()
 
     def rr_arbitration(self):
         # ---------- VC election ----------
-        for vc in self.inPE.vcs:
-            self.vc_target_outport(vc)
-        # Checking North VC
-        for vc in self.inNorth.vcs:
-            self.vc_target_outport(vc)
-        # Checking South VC
-        for vc in self.inSouth.vcs:
-            self.vc_target_outport(vc)
-        # Checking East VC
-        for vc in self.inEast.vcs:
-            self.vc_target_outport(vc)
-        # Checking West VC
-        for vc in self.inWest.vcs:
-            self.vc_target_outport(vc)
+        self.vc_election()
 
         # VC targeting -> North
         if len(self.vcs_target_north) > 0:
-            vc = self.vcs_target_north.pop(0)
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.vcs_target_north.popleft()
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outNorth)
 
             # re-insert if credit is not finished
@@ -268,8 +287,9 @@ class Router:
 
         # VC targeting -> South
         if len(self.vcs_target_south) > 0:
-            vc = self.vcs_target_south.pop(0)
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.vcs_target_south.popleft()
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outSouth)
 
             # re-insert if credit is not finished
@@ -277,8 +297,9 @@ class Router:
 
         # VC targeting -> East
         if len(self.vcs_target_east) > 0:
-            vc = self.vcs_target_east.pop(0)
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.vcs_target_east.popleft()
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outEast)
 
             # re-insert if credit is not finished
@@ -286,8 +307,9 @@ class Router:
 
         # VC targeting -> West
         if len(self.vcs_target_west) > 0:
-            vc = self.vcs_target_west.pop(0)
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.vcs_target_west.popleft()
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outWest)
 
             # re-insert if credit is not finished
@@ -295,8 +317,9 @@ class Router:
 
         # VC targeting -> PE
         if len(self.vcs_target_pe) > 0:
-            vc = self.vcs_target_pe.pop(0)
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.vcs_target_pe.popleft()
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.arrived_flit(vc)
 
             # re-insert if credit is not finished
@@ -304,10 +327,19 @@ class Router:
 
     def vc_reinsertion(self, vc, target_queue):
         if vc.quantum > 0 and len(vc.flits) > 0:
-            target_queue.insert(0, vc)
+            target_queue.appendleft(vc)
         else:
             vc.reset_credit()
 
+            # credit is finished : queued again at the next election
+            if len(vc.flits) > 0:
+                self.vcs_pending.add(vc)
+
+    def vc_withdrawal(self, vc, target_queue):
+        # an emptied VC stops requesting its outport
+        if len(vc.flits) == 0:
+            target_queue.remove(vc)
+
     def get_highest_preemptive_priority_vc(self, candidates):
 
         # No Arbitration
@@ -316,7 +348,7 @@ class Router:
 
         # filtering by timestamp
         for can in candidates:
-            if can.flits[-1].timestamp == self.env.now:
+            if can.head().timestamp == self.env.now:
                 candidates.remove(can)
 
         priority_vc = candidates[0]
@@ -330,55 +362,47 @@ class Router:
 
     def priority_preemptive_arbitration(self):
         # ---------- VC election ----------
-        for vc in self.inPE.vcs:
-            self.vc_target_outport(vc)
-        # Checking North VC
-        for vc in self.inNorth.vcs:
-            self.vc_target_outport(vc)
-        # Checking South VC
-        for vc in self.inSouth.vcs:
-            self.vc_target_outport(vc)
-        # Checking East VC
-        for vc in self.inEast.vcs:
-            self.vc_target_outport(vc)
-        # Checking West VC
-        for vc in self.inWest.vcs:
-            self.vc_target_outport(vc)
+        self.vc_election()
 
         # VC targeting -> North
         if len(self.vcs_target_north) > 0:
-            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_north)
-            self.vcs_target_north.clear()
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_north.sorted_vcs())
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outNorth)
+            self.vc_withdrawal(vc, self.vcs_target_north)
 
         # VC targeting -> South
         if len(self.vcs_target_south) > 0:
-            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_south)
-            self.vcs_target_south.clear()
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_south.sorted_vcs())
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outSouth)
+            self.vc_withdrawal(vc, self.vcs_target_south)
 
         # VC targeting -> East
         if len(self.vcs_target_east) > 0:
-            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_east)
-            self.vcs_target_east.clear()
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_east.sorted_vcs())
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outEast)
+            self.vc_withdrawal(vc, self.vcs_target_east)
 
         # VC targeting -> West
         if len(self.vcs_target_west) > 0:
-            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_west)
-            self.vcs_target_west.clear()
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_west.sorted_vcs())
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.send_flit(vc, self.outWest)
+            self.vc_withdrawal(vc, self.vcs_target_west)
 
         # VC targeting -> PE
         if len(self.vcs_target_pe) > 0:
-            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_pe)
-            self.vcs_target_pe.clear()
-            self.logger.debug('(%d) - %s From %s -> Elected' % (self.env.now, vc, self))
+            vc = self.get_highest_preemptive_priority_vc(self.vcs_target_pe.sorted_vcs())
+            if self.trace_debug:
+                self.logger.debug('(%d) - %s From %s -> Elected', self.env.now, vc, self)
             self.arrived_flit(vc)
+            self.vc_withdrawal(vc, self.vcs_target_pe)
 
     def __str__(self):
         return 'Router (%d,%d)' % (self.coordinate.i, self.coordinate.j)
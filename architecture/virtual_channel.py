@@ -1,7 +1,65 @@
 import copy
 
 
+class FlitBuffer:
+    # Fixed-capacity ring buffer : head() is the oldest flit, tail() the newest
+    __slots__ = ('slots', 'capacity', 'start', 'size')
+
+    def __init__(self, capacity):
+        self.slots = [None] * capacity
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+
+    def append(self, flit):
+        if self.size >= self.capacity:
+            return False
+
+        self.slots[(self.start + self.size) % self.capacity] = flit
+        self.size += 1
+        return True
+
+    def appendleft(self, flit):
+        if self.size >= self.capacity:
+            return False
+
+        self.start = (self.start - 1) % self.capacity
+        self.slots[self.start] = flit
+        self.size += 1
+        return True
+
+    def popleft(self):
+        if self.size <= 0:
+            return None
+
+        flit = self.slots[self.start]
+        self.slots[self.start] = None
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+        return flit
+
+    def head(self):
+        if self.size <= 0:
+            return None
+        return self.slots[self.start]
+
+    def tail(self):
+        if self.size <= 0:
+            return None
+        return self.slots[(self.start + self.size - 1) % self.capacity]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self.slots[(self.start + i) % self.capacity]
+
+
 class VirtualChannel:
+    __slots__ = ('id', 'lock', 'direction', 'router', 'max_size', 'default_quantum', 'quantum', 'flits', 'order',
+                 'next_hop')
+
     def __init__(self, id, direction, router, max_size, quantum):
         self.id = id
         self.lock = False
@@ -10,23 +68,28 @@ class VirtualChannel:
         self.max_size = max_size
         self.default_quantum = quantum
         self.quantum = quantum
-        self.flits = []
+        self.flits = FlitBuffer(max_size)
+        self.order = (0, id)  # position in the router scan, set by the InPort
+        self.next_hop = None  # VC allotted downstream to the packet being forwarded
 
     def enqueue(self, flit):
-        if len(self.flits) >= self.max_size:
-            return False
+        # the router learns about a VC when it stops being empty
+        if len(self.flits) == 0 and self.router is not None:
+            self.router.vc_request(self)
 
-        self.flits.insert(0, flit)
-        return True
+        return self.flits.append(flit)
 
     def restore(self, flit):
-        self.flits.append(flit)
+        self.flits.appendleft(flit)
 
     def dequeue(self):
-        if len(self.flits) <= 0:
-            return None
+        return self.flits.popleft()
+
+    def head(self):
+        return self.flits.head()
 
-        return self.flits.pop()
+    def tail(self):
+        return self.flits.tail()
 
     def isFree(self):
         return not self.lock
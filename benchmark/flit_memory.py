@@ -0,0 +1,60 @@
+import tracemalloc
+
+from architecture.virtual_channel import VirtualChannel
+from communication.routing import Coordinate, Direction
+from communication.structure import Flit, FlitType, Message
+
+NUMBER = 100000
+
+
+def dict_backed(cls):
+    # The same class without __slots__, i.e. the former dict-backed layout
+    attributes = dict()
+    for key, value in vars(cls).items():
+        if key != '__slots__' and key not in cls.__slots__:
+            attributes[key] = value
+    return type('Dict' + cls.__name__, (), attributes)
+
+
+def bytes_per_object(factory, number=NUMBER):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(number)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # the list holding the objects is not part of their size
+    return (after - before) / len(objects) - 8
+
+
+def flit_factory(cls, message):
+    packet = message.packets[0]
+
+    def factory(i):
+        flit = cls(i % 10, FlitType.body, 0, packet, message.priority)
+        flit.set_destination_info(message.dest)
+        return flit
+
+    return factory
+
+
+def vc_factory(cls):
+    def factory(i):
+        return cls(i % 10, Direction.north, None, 10, 1)
+
+    return factory
+
+
+def main():
+    message = Message(1, 1000, 320, 0, 1000, Coordinate(0, 0), Coordinate(3, 2), 1)
+
+    print('%-16s %10s %10s' % ('Object', 'dict', 'slots'))
+    for cls, factory in [(Flit, lambda c: flit_factory(c, message)),
+                         (VirtualChannel, vc_factory)]:
+        before = bytes_per_object(factory(dict_backed(cls)))
+        after = bytes_per_object(factory(cls))
+        print('%-16s %10.1f %10.1f' % (cls.__name__, before, after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import random
+import time
+
+from architecture.array_noc import ArrayNoC
+from architecture.partitioned_noc import PartitionedNoC
+from communication.routing import Coordinate
+from communication.structure import Message
+
+# (mesh dimension, messages, cycles) of the runs
+SETTINGS = [(16, 100, 600), (32, 400, 600), (64, 1500, 300)]
+TILES = [(1, 2), (2, 2)]
+
+
+def taskset(square_size, number):
+    generator = random.Random(square_size)
+    messages = []
+    for counter in range(number):
+        src = Coordinate(generator.randrange(square_size), generator.randrange(square_size))
+        dest = src
+        while dest.i == src.i and dest.j == src.j:
+            dest = Coordinate(generator.randrange(square_size), generator.randrange(square_size))
+        messages.append(Message(counter, generator.choice([150, 200, 300]), generator.choice([320, 960, 1600]), 0,
+                                200, src, dest, generator.randrange(3)))
+    return messages
+
+
+def timed_run(noc, messages, until):
+    noc.messages = messages
+    noc.arbitration = 'RR'
+    start = time.time()
+    messages_instance = noc.run(until)
+    return time.time() - start, [(mi.id, mi.instance, mi._depart_time, mi._arrival_time) for mi in messages_instance]
+
+
+def main():
+    # bound : the speedup given a core per tile, without the barrier waits
+    print('%d cores' % len(os.sched_getaffinity(0)))
+    print('%-6s %-6s %8s %12s %8s %8s %8s %6s' % ('Mesh', 'Tiles', 'array', 'partitioned', 'span', 'speedup',
+                                                  'bound', 'same'))
+    for square_size, number, until in SETTINGS:
+        array_time, expected = timed_run(ArrayNoC(square_size, 3, 12, [2, 1, 1]), taskset(square_size, number), until)
+        for tiles in TILES:
+            noc = PartitionedNoC(square_size, 3, 12, [2, 1, 1], tiles)
+            partitioned_time, result = timed_run(noc, taskset(square_size, number), until)
+            print('%-6d %-6s %7.2fs %11.2fs %7.2fs %7.2fx %7.2fx %6s' % (square_size, '%dx%d' % tiles, array_time,
+                                                                         partitioned_time, noc.span,
+                                                                         array_time / partitioned_time,
+                                                                         array_time / noc.span, result == expected))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import enum
+from array import array
 
 
 class Direction(enum.Enum):
@@ -20,3 +21,19 @@ class Coordinate:
 
     def add_link_utilization(self, value):
         self.link_utilization += value
+
+
+class Path:
+    # XY route between two routers : (router id, router id) hops, link ids and their set for intersection tests
+    __slots__ = ('links', 'ids', 'link_set')
+
+    def __init__(self, links, ids):
+        self.links = tuple(links)
+        self.ids = array('i', ids)
+        self.link_set = frozenset(ids)
+
+    def intersects(self, path):
+        return not self.link_set.isdisjoint(path.link_set)
+
+    def __len__(self):
+        return len(self.links)
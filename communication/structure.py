@@ -1,4 +1,3 @@
-import copy
 import enum
 from collections import namedtuple
 
@@ -8,7 +7,16 @@ FLIT_DEFAULT_SIZE = 32
 PACKET_DEFAULT_SIZE = 320
 
 
+def link_utilization(size, period):
+    # flits per cycle of a message, its size being rounded up to whole packets
+    size = PACKET_DEFAULT_SIZE * int(math.ceil(float(size / PACKET_DEFAULT_SIZE)))
+    size_cycle = float(size / FLIT_DEFAULT_SIZE)
+    return round(float(size_cycle / period), 2)
+
+
 class Packet:
+    __slots__ = ('id', 'message', 'priority', 'flits')
+
     def __init__(self, id, dest, message, priority=-1):
         self.id = id
         self.message = message
@@ -28,6 +36,13 @@ class Packet:
 
         self.set_destination(dest)
 
+    def recycle(self, id, message):
+        # Reuse a delivered packet (and its flits) for a new message instance
+        self.id = id
+        self.message = message
+        for flit in self.flits:
+            flit.timestamp = -1
+
     def set_destination(self, dest):
         for flit in self.flits:
             flit.set_destination_info(dest)
@@ -48,6 +63,8 @@ class FlitType(enum.Enum):
 
 #############################################################
 class Flit:
+    __slots__ = ('id', 'type', 'begin_time', 'destination', 'priority', 'packet', 'timestamp', 'arrival_time')
+
     def __init__(self, id, type, begin_time, packet, priority=-1):
         self.id = id
         self.type = type
@@ -73,6 +90,9 @@ class Flit:
 
 #############################################################
 class Message:
+    __slots__ = ('id', 'period', 'offset', 'deadline', 'src', 'dest', 'size', 'priority', 'packets',
+                 'instance_number', 'packet_pool')
+
     def __init__(self, id, period, size, offset, deadline, src, dest, priority=-1):
         self.id = id
         self.period = period
@@ -85,60 +105,50 @@ class Message:
         self.packets = []
         self.instance_number = 0
 
+        # Delivered packets, ready to be reused by the next instances
+        self.packet_pool = []
+
         # Packet construct
         packetNumber = int(math.ceil(float(self.size / PACKET_DEFAULT_SIZE)))
         self.size = PACKET_DEFAULT_SIZE * packetNumber
         for i in range(packetNumber):
             self.packets.append(Packet(i, self.dest, self, self.priority))
 
+    def packet_allocation(self, message_instance):
+        # Packets of a new instance : pooled ones first, built ones otherwise
+        packets = []
+        for i in range(len(self.packets)):
+            if len(self.packet_pool) > 0:
+                packet = self.packet_pool.pop()
+                packet.recycle(i, message_instance)
+            else:
+                packet = Packet(i, self.dest, message_instance, self.priority)
+            packets.append(packet)
+
+        return packets
+
+    def recycle_packet(self, packet):
+        self.packet_pool.append(packet)
+
     def basic_network_latency(self, noc):
         nbpacket = len(self.packets)
         nbflit = nbpacket * len(self.packets[0].flits)
 
-        return nbflit + len(self.get_xy_path_coordinate(noc))
+        return nbflit + len(self.get_xy_path(noc))
 
     def get_link_utilization(self):
-        size_cycle = float(self.size / FLIT_DEFAULT_SIZE)
-        return round(float(size_cycle / self.period), 2)
+        return link_utilization(self.size, self.period)
 
     def get_priority(self):
         return self.priority
 
+    def get_xy_path(self, noc):
+        # cached by the NoC : computed once per (src, dest)
+        return noc.xy_path(self.src, self.dest)
+
     def get_xy_path_coordinate(self, noc):
-        src = copy.copy(self.src)
-        dest = self.dest
-
-        # put the first router
-        path_array = [noc.router_matrix[src.i][src.j].id]
-        tuple_array = []
-
-        while True:
-            # On X axe (Column)
-            # By the West
-            if src.j > dest.j:
-                src.j -= 1
-                path_array.append(noc.router_matrix[src.i][src.j].id)
-            # By the East
-            elif src.j < dest.j:
-                src.j += 1
-                path_array.append(noc.router_matrix[src.i][src.j].id)
-            # On Y axe (Row)
-            else:
-                if src.i > dest.i:
-                    src.i -= 1
-                    path_array.append(noc.router_matrix[src.i][src.j].id)
-                # By the East
-                elif src.i < dest.i:
-                    src.i += 1
-                    path_array.append(noc.router_matrix[src.i][src.j].id)
-                else:
-                    break
-
-        # convert a 1D array --> tuple(src, dest)
-        for i in range(len(path_array) - 1):
-            tuple_array.append((path_array[i], path_array[i + 1]))
-
-        return tuple_array
+        # XY route as (router id, router id) links
+        return noc.xy_path(self.src, self.dest).links
 
     def __str__(self):
         return '[id: %d -- size: %d -- period: %d -- offset: %d -- deadline: %d ' \
@@ -150,9 +160,22 @@ class Message:
 
 
 class MessageInstance(Message):
-    def __init__(self, message, instance):
-        super().__init__(message.id, message.period, message.size, message.offset,
-                         message.deadline, message.src, message.dest, message.priority)
+    __slots__ = ('template', 'instance', 'packet_wait', 'flit_wait', '_arrival_time', '_depart_time')
+
+    def __init__(self, message, instance, allocation=True):
+        # Settings are copied from the message, packets come from its pool (none for the replayed instances)
+        self.id = message.id
+        self.period = message.period
+        self.offset = message.offset
+        self.deadline = message.deadline
+        self.src = message.src
+        self.dest = message.dest
+        self.size = message.size
+        self.priority = message.priority
+        self.instance_number = 0
+        self.packet_pool = []
+        self.template = message
+        self.packets = message.packet_allocation(self) if allocation else []
         self.instance = instance
 
         # Meta data relative to sending
@@ -176,7 +199,7 @@ class MessageInstance(Message):
     def is_deadline_met(self):
         if self._arrival_time is None:
             return None
-        return self._arrival_time <= self.deadline + (self.instance * self.period)
+        return self._arrival_time <= self.offset + self.deadline + (self.instance * self.period)
 
     def get_priority(self):
         if hasattr(self, 'priority'):
@@ -189,6 +212,8 @@ class MessageInstance(Message):
 
 #############################################################
 class Node:
+    __slots__ = ('vc_src', 'vc_target')
+
     def __init__(self, vc_src, vc_target):
         self.vc_src = vc_src
         self.vc_target = vc_target
@@ -0,0 +1,131 @@
+import multiprocessing
+
+import simpy
+
+from architecture.noc import NoC
+
+
+class Candidate:
+    # A NoC setting to simulate over one hyperperiod
+    def __init__(self, square_size, nbvc, vc_size, vc_quantum, scheduling, arbitration, messages, hyperperiod,
+                 fail_fast=True):
+        self.square_size = square_size
+        self.nbvc = nbvc
+        self.vc_size = vc_size
+        self.vc_quantum = vc_quantum
+        self.scheduling = scheduling
+        self.arbitration = arbitration
+        self.messages = messages
+        self.hyperperiod = hyperperiod
+        self.fail_fast = fail_fast
+
+
+def simulate_candidate(candidate):
+    # True if every message instance meets its deadline
+    env = simpy.Environment()
+    noc = NoC(env, 'Network-On-Chip', candidate.square_size, candidate.nbvc, candidate.vc_size,
+              candidate.vc_quantum, candidate.scheduling)
+
+    # instance numbers start again for each simulated setting
+    for message in candidate.messages:
+        message.instance_number = 0
+
+    noc.messages = candidate.messages
+    noc.arbitration = candidate.arbitration
+    if candidate.fail_fast:
+        noc.fail_fast_setting()
+
+    env.run(until=candidate.hyperperiod)
+
+    if noc.deadline_miss is not None:
+        return False
+    for message_instance in noc.messages_instance:
+        if not message_instance.is_deadline_met():
+            return False
+    return True
+
+
+class AugmentationSearch:
+    """
+    Minimal number of VCs per InPort meeting every deadline, assuming that adding VCs never breaks a
+    schedulable setting. The bound is bracketed by doubling steps from the configured number, then
+    narrowed down; each round simulates up to `workers` candidates concurrently.
+    """
+
+    def __init__(self, generation, messages, workers=1, fail_fast=True, limit=128):
+        self.generation = generation
+        self.messages = messages
+        self.hyperperiod = generation.hyperperiod()
+        self.workers = workers
+        self.fail_fast = fail_fast
+        self.limit = limit
+        self.pool = None
+        self.results = dict()  # nbvc -> schedulable
+
+    def vc_quantum(self, nbvc):
+        # configured quantum, the added VCs get a quantum of 1
+        quantum = self.generation.vc_quantum()[:self.generation.nbvc() - 1]
+        return quantum + [1] * (nbvc - len(quantum))
+
+    def candidate(self, nbvc):
+        return Candidate(self.generation.square_size(), nbvc, self.generation.vc_size(), self.vc_quantum(nbvc),
+                         self.generation.scheduling(), self.generation.arbitration(), self.messages,
+                         self.hyperperiod, self.fail_fast)
+
+    def evaluate(self, numbers):
+        numbers = [nbvc for nbvc in numbers if nbvc not in self.results]
+        candidates = [self.candidate(nbvc) for nbvc in numbers]
+
+        if self.pool is None:
+            schedulable = [simulate_candidate(candidate) for candidate in candidates]
+        else:
+            schedulable = self.pool.map(simulate_candidate, candidates, chunksize=1)
+
+        for nbvc, result in zip(numbers, schedulable):
+            self.results[nbvc] = result
+
+    def bracket(self):
+        # doubling steps from the configured number : (highest failing, lowest passing)
+        base = self.generation.nbvc() - 1
+        lower = base
+        step = 1
+        while lower < self.limit:
+            numbers = []
+            while len(numbers) < self.workers and (len(numbers) == 0 or numbers[-1] < self.limit):
+                numbers.append(min(base + step, self.limit))
+                step *= 2
+            self.evaluate(numbers)
+
+            for nbvc in numbers:
+                if self.results[nbvc]:
+                    return lower, nbvc
+                lower = nbvc
+        return lower, None
+
+    def search(self):
+        if self.workers > 1:
+            self.pool = multiprocessing.Pool(self.workers)
+
+        try:
+            lower, upper = self.bracket()
+            if upper is None:
+                return None
+
+            # split ]lower, upper[ into workers + 1 intervals at each round
+            while upper - lower > 1:
+                width = upper - lower
+                numbers = sorted(set(lower + (width * (i + 1)) // (self.workers + 1) for i in range(self.workers)))
+                numbers = [nbvc for nbvc in numbers if lower < nbvc < upper]
+                self.evaluate(numbers)
+
+                for nbvc in numbers:
+                    if self.results[nbvc]:
+                        upper = nbvc
+                        break
+                    lower = nbvc
+            return upper
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                self.pool = None
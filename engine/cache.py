@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from communication.structure import MessageInstance
+
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """
+    On-disk simulation results, addressed by a hash of the NoC setting and of the taskset. An entry
+    holds the depart and arrival times of every message instance; the least recently used entries
+    are evicted once the cache grows over `max_size` bytes. With `bypass`, lookups always miss and
+    the fresh results replace the stored ones.
+    """
+
+    def __init__(self, directory, max_size=64 * 1024 * 1024, bypass=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.bypass = bypass
+
+    @staticmethod
+    def key(square_size, nbvc, vc_size, vc_quantum, arbitration, messages, hyperperiod, fail_fast=False):
+        # The scheduling mode is left out : the modes give the same results over a whole hyperperiod. A
+        # fail-fast run stops at the first deadline miss, `fail_fast` must only be set for the modes honouring it
+        content = {
+            'version': CACHE_VERSION,
+            'dimension': square_size,
+            'numberOfVC': nbvc,
+            'VCBufferSize': vc_size,
+            'quantum': list(vc_quantum),
+            'arbitration': arbitration,
+            'hyperperiod': hyperperiod,
+            'failFast': bool(fail_fast),
+            'messages': [[m.id, m.period, m.size, m.offset, m.deadline, m.src.i, m.src.j, m.dest.i, m.dest.j,
+                          m.priority] for m in messages],
+        }
+        canonical = json.dumps(content, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def load(self, key, messages):
+        # message instances of a stored run, None on a miss
+        if self.bypass:
+            return None
+
+        try:
+            with open(self.path(key)) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        # the entry becomes the most recently used one
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+
+        templates = dict((message.id, message) for message in messages)
+        messages_instance = []
+        for id, instance, depart_time, arrival_time in entry['instances']:
+            message_instance = MessageInstance(templates[id], instance, allocation=False)
+            message_instance.set_depart_time(depart_time)
+            message_instance.set_arrival_time(arrival_time)
+            messages_instance.append(message_instance)
+        return messages_instance
+
+    def store(self, key, messages_instance):
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {'instances': [[mi.id, mi.instance, mi._depart_time, mi._arrival_time]
+                               for mi in messages_instance]}
+
+        # written aside then renamed, concurrent workers never read a partial entry
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(entry, file, separators=(',', ':'))
+        os.replace(temporary, self.path(key))
+
+        self.eviction()
+
+    def entries(self):
+        # (mtime, size, path) of the stored entries, least recently used first
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def eviction(self):
+        entries = self.entries()
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        for mtime, size, path in self.entries():
+            os.remove(path)
@@ -1,4 +1,5 @@
 import enum
+import heapq
 
 
 class EventType(enum.Enum):
@@ -14,6 +15,8 @@ class EventType(enum.Enum):
 class EventList:
     def __init__(self):
         self.queue = dict()
+        self.timeline = []  # heap of pending timestamps
+        self.entities = dict()  # timestamp -> {entity id: pending events}, to avoid duplicate election
         self.register = dict()  # has a purpose to avoid duplicate event in the same timestamp
 
     def isEmpty(self):
@@ -23,10 +26,8 @@ class EventList:
 
         # Avoiding duplcation election in the same router
         if event.event_type == EventType.VC_ELECTION:
-            if event.time in self.queue:
-                for node in self.queue[event.time]:
-                    if node.time == event.time and node.entity == event.entity:
-                        return
+            if id(event.entity) in self.entities.get(event.time, ()):
+                return
 
         # Avoiding duplicate event
         if self.double_event(event):
@@ -37,8 +38,12 @@ class EventList:
             if event.time in self.queue:
                 self.queue[event.time].append(event)
             else:
-                self.queue[event.time] = []
-                self.queue[event.time].append(event)
+                self.queue[event.time] = [event]
+                self.entities[event.time] = dict()
+                heapq.heappush(self.timeline, event.time)
+
+            entities = self.entities[event.time]
+            entities[id(event.entity)] = entities.get(id(event.entity), 0) + 1
 
     def pull(self, time):
         if time in self.queue:
@@ -46,29 +51,52 @@ class EventList:
         else:
             return None
 
+    def pop(self, time):
+        if time not in self.queue:
+            return None
+
+        events = self.queue[time]
+        event = events.pop()
+
+        # entity bookkeeping
+        entities = self.entities[time]
+        entities[id(event.entity)] -= 1
+        if entities[id(event.entity)] == 0:
+            del entities[id(event.entity)]
+
+        if len(events) == 0:
+            del self.queue[time]
+            del self.entities[time]
+
+        return event
+
+    def next_time(self, time):
+        # drop timestamps already consumed or lying in the past
+        while len(self.timeline) > 0 and \
+                (self.timeline[0] not in self.queue or self.timeline[0] < time):
+            heapq.heappop(self.timeline)
+
+        if len(self.timeline) > 0:
+            return self.timeline[0]
+        return None
+
+    def forget(self, time):
+        # the clock left this timestamp : its registered senders are useless
+        self.register.pop(time, None)
+
     def double_event(self, event):
         if event.event_type == EventType.SEND_FLIT:
-            entity1 = event.entity['router']
-            entity2 = event.entity['outport']
-            send_node = SendNode(entity1, entity2)
+            send_node = (event.entity['router'], event.entity['outport'])
 
             if event.time in self.register:
-                for node in self.register[event.time]:
-                    if node.router == entity1 and node.output == entity2:
-                        return True
+                if send_node in self.register[event.time]:
+                    return True
                 else:
-                    self.register[event.time].append(send_node)
+                    self.register[event.time].add(send_node)
                     return False
             else:
-                self.register[event.time] = []
-                self.register[event.time].append(send_node)
+                self.register[event.time] = {send_node}
                 return False
 
     def __str__(self):
-        return '\n'.join([str(i) for i in self.queue])
-
-
-class SendNode:
-    def __init__(self, router, output):
-        self.router = router
-        self.output = output
+        return '\n'.join([str(i) for i in sorted(self.queue)])
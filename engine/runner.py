@@ -0,0 +1,150 @@
+import csv
+import functools
+import logging
+import multiprocessing
+import os
+import time
+
+import simpy
+
+from architecture.array_noc import ArrayNoC
+from architecture.noc import NoC
+from architecture.partitioned_noc import PartitionedNoC
+from engine.cache import ResultCache
+from gen.csv_writer import CSVWriter
+from gen.generation import Generation, job_random
+
+SUMMARY_HEADER = ['directory', 'arbitration', 'tasks', 'hyperperiod', 'instances', 'deadline_misses',
+                  'max_latency', 'time']
+
+
+def input_directories(root):
+    # scenario directories : every sub-directory holding a config.yml and a scenario.yml
+    directories = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isfile(os.path.join(path, 'config.yml')) and os.path.isfile(os.path.join(path, 'scenario.yml')):
+            directories.append(path)
+    return directories
+
+
+def simulate_directory(directory, cache=None, seed=None):
+    # Analysis and simulation of one scenario directory, with its own SimPy environment
+    # A cached run of the same setting and taskset replaces the simulation
+    start = time.time()
+    env = simpy.Environment()
+
+    # NoC Settings, the taskset generator of a seeded run depends on the directory name only
+    generation = Generation()
+    if seed is not None:
+        generation.set_random(job_random(seed, os.path.basename(directory)))
+    generation.config(os.path.join(directory, 'config.yml'))
+
+    square_size = generation.square_size()
+    nbvc = generation.nbvc()
+    vc_size = generation.vc_size()
+    vc_quantum = generation.vc_quantum()
+    arbitration = generation.arbitration()
+    scheduling = generation.scheduling()
+
+    noc = NoC(env, 'Network-On-Chip', square_size, nbvc, vc_size, vc_quantum, scheduling)
+    generation.set_noc(noc)
+
+    # Messages generation
+    messages = generation.scenario(os.path.join(directory, 'scenario.yml'))
+
+    logging.info('------ %s ------' % directory)
+    logging.info('\tTaskset : %d' % len(messages))
+    logging.info('\tHP : %d' % generation.hyperperiod())
+    logging.info('\tDimension : %d x %d' % (square_size, square_size))
+    logging.info('\tVC Number per Input : %d' % nbvc)
+    logging.info('\tVC Buffer size : %d' % vc_size)
+    logging.info('\tVC Quantum setting : %s' % vc_quantum)
+    logging.info('\tArbitration Policy : %s' % arbitration)
+    logging.info('\tScheduling : %s' % scheduling)
+
+    # Analysis
+    csv_writer = CSVWriter(messages, arbitration, noc)
+    csv_writer.analysis_trace_csv(os.path.join(directory, 'result_analysis.csv'), messages)
+
+    # Simulation
+    key = None
+    messages_i = None
+    if cache is not None:
+        # the array engines ignore failFast : their runs cover the whole hyperperiod
+        fail_fast = generation.fail_fast() and scheduling not in ('ARRAY', 'PARTITIONED')
+        key = ResultCache.key(square_size, nbvc, vc_size, vc_quantum, arbitration, messages,
+                              generation.hyperperiod(), fail_fast)
+        messages_i = cache.load(key, messages)
+
+    if messages_i is not None:
+        logging.info('### Simulation --> CACHED ###')
+    elif scheduling in ['ARRAY', 'PARTITIONED']:
+        if scheduling == 'ARRAY':
+            array_noc = ArrayNoC(square_size, nbvc, vc_size, vc_quantum)
+        else:
+            array_noc = PartitionedNoC(square_size, nbvc, vc_size, vc_quantum, generation.tiles())
+        array_noc.messages = messages
+        array_noc.arbitration = arbitration
+
+        logging.info('### Simulation --> START - hyperperiod : %d ###' % generation.hyperperiod())
+        messages_i = array_noc.run(generation.hyperperiod())
+        logging.info('### Simulation --> END ###')
+
+        if cache is not None:
+            cache.store(key, messages_i)
+    else:
+        noc.messages = messages
+        noc.arbitration = arbitration
+        if generation.fail_fast():
+            noc.fail_fast_setting()
+
+        logging.info('### Simulation --> START - hyperperiod : %d ###' % generation.hyperperiod())
+        env.run(until=generation.hyperperiod())
+        logging.info('### Simulation --> END ###')
+
+        messages_i = noc.messages_instance
+        if cache is not None:
+            cache.store(key, messages_i)
+
+    csv_writer = CSVWriter(messages_i, 0, noc)
+    csv_writer.simulation_trace_csv(os.path.join(directory, 'result_sim.csv'))
+
+    misses = 0
+    max_latency = -1
+    for mi in messages_i:
+        if not mi.is_deadline_met():
+            misses += 1
+        max_latency = max(max_latency, mi.get_latency())
+
+    return [directory, arbitration, len(messages), generation.hyperperiod(), len(messages_i), misses,
+            max_latency, round(time.time() - start, 3)]
+
+
+def logging_setting(level):
+    logging.basicConfig(level=level, handlers=[logging.StreamHandler()])
+
+
+def run(directories, workers=1, level=logging.WARNING, cache=None, seed=None):
+    # One job per scenario directory : in-process for a single worker, a process pool otherwise
+    simulate = functools.partial(simulate_directory, cache=cache, seed=seed)
+    if workers <= 1:
+        logging_setting(level)
+        return [simulate(directory) for directory in directories]
+
+    with multiprocessing.Pool(workers, initializer=logging_setting, initargs=(level,)) as pool:
+        return pool.map(simulate, directories, chunksize=1)
+
+
+def summary_trace_csv(link, summary, header=SUMMARY_HEADER):
+    with open(link, mode='w') as file:
+        writer = csv.writer(file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(header)
+        for row in summary:
+            writer.writerow(row)
+
+
+def summary_table(summary, header=SUMMARY_HEADER):
+    rows = [header] + [[str(value) for value in row] for row in summary]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join('  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
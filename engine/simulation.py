@@ -2,10 +2,8 @@ from communication.structure import MessageInstance
 from engine.event import Event
 from engine.event_list import EventType
 from engine.global_obj import EVENT_LIST
-from gen.trace import TraceSet
 
 CLOCK = 0
-TRACESET = TraceSet()
 
 
 class Simulation:
@@ -18,37 +16,32 @@ class Simulation:
     def send_message(self, message):
 
         instance_count = 1
-        for i in range(self.hyperperiod):
-            if i % message.period == 0:
-                message_instance = MessageInstance(message, instance_count)
-                event = Event(EventType.SEND_MESSAGE, message_instance,
-                              i + message_instance.offset)
-                EVENT_LIST.push(event)
+        for i in range(0, self.hyperperiod, message.period):
+            message_instance = MessageInstance(message, instance_count)
+            event = Event(EventType.SEND_MESSAGE, message_instance,
+                          i + message_instance.offset)
+            EVENT_LIST.push(event)
 
-                # Instance Saving
-                self._message_instance_tab.append(message_instance)
-                instance_count += 1
+            # Instance Saving
+            self._message_instance_tab.append(message_instance)
+            instance_count += 1
 
     def simulate(self, arbitration):
         global CLOCK
-        global TRACESET
         while not EVENT_LIST.isEmpty() and CLOCK < self.hyperperiod:
 
             # time.sleep(1)
 
-            events = EVENT_LIST.pull(CLOCK)
+            current_event = EVENT_LIST.pop(CLOCK)
 
             # print('------------------- %d -------------------' % CLOCK)
-            # if events is not None:
-            #     for ev in events:
-            #         print(ev)
+            # print(current_event)
 
             # for key in EVENT_LIST.register.keys():
             #     for router in EVENT_LIST.register[key]:
             #         print('%d -> %s' % (key, router))
 
-            if events is not None and len(events) > 0:
-                current_event = events.pop()
+            if current_event is not None:
 
                 #### Processing Engine Events ####
                 if current_event.event_type == EventType.SEND_MESSAGE:
@@ -111,7 +104,13 @@ class Simulation:
                     router.router_check(CLOCK, arbitration)
 
             else:
-                CLOCK += 1
+                # Skip-ahead : jump straight to the next pending timestamp
+                EVENT_LIST.forget(CLOCK)
+                next_time = EVENT_LIST.next_time(CLOCK)
+                if next_time is None:
+                    CLOCK = self.hyperperiod
+                else:
+                    CLOCK = next_time
 
     def reset_clock(self):
         global CLOCK
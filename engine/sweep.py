@@ -0,0 +1,188 @@
+import csv
+import logging
+import multiprocessing
+import os
+import time
+
+import simpy
+
+from analysis.batch_latency import BatchQinModel, BatchTDMA
+from architecture.noc import NoC
+from engine.augmentation import Candidate, simulate_candidate
+from gen.generation import Generation, job_random
+
+SWEEP_HEADER = ['config', 'tasks', 'load', 'sample', 'hyperperiod', 'analysis', 'simulation', 'time']
+RATIO_HEADER = ['config', 'tasks', 'load', 'tasksets', 'analysis_ratio', 'simulation_ratio']
+SETTINGS = dict()  # config file -> (Generation, NoC) of the analysis, per process
+
+
+def load_range(minimum, maximum, step):
+    # load levels from minimum to maximum (included)
+    loads = []
+    count = 0
+    while minimum + count * step <= maximum + 1e-9:
+        loads.append(round(minimum + count * step, 6))
+        count += 1
+    return loads
+
+
+class SweepJob:
+    # One generated taskset : a NoC setting, a task number, a load level, a sample index and the
+    # parameters of the messages (rows of Generation.uunifast_batch)
+    def __init__(self, config, tasks, load, sample, parameters):
+        self.config = config
+        self.tasks = tasks
+        self.load = load
+        self.sample = sample
+        self.parameters = parameters
+
+    def key(self):
+        # the columns identifying the taskset in the results file
+        return (self.config, str(self.tasks), '%g' % self.load, str(self.sample))
+
+
+def analysis_schedulable(noc, arbitration, messages):
+    # every task meets its deadline according to the analysis of the arbitration
+    if arbitration == 'PRIORITY_PREEMPT':
+        latencies = BatchQinModel(noc, messages).latency_nth()
+    else:
+        # a message may be given any VC : the smallest quantum bounds its latency
+        tdma = BatchTDMA(noc, noc.vc_quantum)
+        latencies = tdma.latency(messages, min(tdma.slot_table))
+
+    return all(latency <= message.deadline for message, latency in zip(messages, latencies.tolist()))
+
+
+def config_setting(config):
+    # (Generation, NoC) of a config file, built once per process : the analysis only reads the XY paths of the NoC
+    if config not in SETTINGS:
+        generation = Generation()
+        generation.config(config)
+        noc = NoC(simpy.Environment(), 'Network-On-Chip', generation.square_size(), generation.nbvc(),
+                  generation.vc_size(), generation.vc_quantum(), generation.scheduling())
+        SETTINGS[config] = (generation, noc)
+    return SETTINGS[config]
+
+
+def evaluate_job(job):
+    # Analysis and simulation of one taskset
+    start = time.time()
+    generation, noc = config_setting(job.config)
+    messages = generation.taskset(job.parameters)
+
+    analysis = analysis_schedulable(noc, generation.arbitration(), messages)
+
+    # the simulation stops at the first deadline miss
+    candidate = Candidate(generation.square_size(), generation.nbvc(), generation.vc_size(),
+                          generation.vc_quantum(), generation.scheduling(), generation.arbitration(), messages,
+                          generation.hyperperiod())
+    simulation = simulate_candidate(candidate)
+
+    return list(job.key()) + [generation.hyperperiod(), int(analysis), int(simulation),
+                              round(time.time() - start, 3)]
+
+
+class Sweep:
+    """
+    Schedulability ratios over UUniFast tasksets : `samples` tasksets are generated for every NoC setting
+    (config.yml file), task number and load level, then checked by analysis and by simulation. The verdicts
+    are appended to a CSV file as the tasksets complete, in any order; a sweep run again on the same file
+    only evaluates the missing tasksets. The tasksets of a task number and a load level are drawn at once,
+    from a generator seeded by `seed`, the task number and the load level : a resumed sweep gives the same
+    tasksets, and the settings of a mesh dimension are compared on the same tasksets.
+    """
+
+    def __init__(self, configs, task_numbers, loads, samples, path, workers=1, seed=0):
+        self.configs = configs
+        self.task_numbers = task_numbers
+        self.loads = loads
+        self.samples = samples
+        self.path = path
+        self.workers = workers
+        self.seed = seed
+        self.throughput = 0
+
+    def jobs(self):
+        jobs = []
+        for config in self.configs:
+            generation = Generation()
+            generation.config(config)
+            for tasks in self.task_numbers:
+                for load in self.loads:
+                    generation.set_random(job_random(self.seed, '%d:%g' % (tasks, load)))
+                    parameters = generation.uunifast_batch(self.samples, tasks, load)
+                    jobs += [SweepJob(config, tasks, load, sample, parameters[sample].tolist())
+                             for sample in range(self.samples)]
+        return jobs
+
+    def results(self):
+        # complete rows of the results file
+        if not os.path.isfile(self.path):
+            return []
+
+        with open(self.path, newline='') as file:
+            content = file.read()
+
+        # a row is complete once its line is ended
+        lines = [line for line in content.splitlines(True) if line.endswith('\n')]
+        return [row for row in csv.reader(lines[1:]) if len(row) == len(SWEEP_HEADER)]
+
+    def completed(self):
+        # keys of the evaluated tasksets, the file is rewritten without the row of an interrupted write
+        rows = self.results()
+        with open(self.path, mode='w', newline='') as file:
+            writer = csv.writer(file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(SWEEP_HEADER)
+            for row in rows:
+                writer.writerow(row)
+        return set(tuple(row[:4]) for row in rows)
+
+    def run(self):
+        # evaluates the missing tasksets, returns their number
+        done = self.completed()
+        jobs = [job for job in self.jobs() if job.key() not in done]
+        logging.info('### Sweep --> %d tasksets, %d already evaluated ###' % (len(jobs), len(done)))
+
+        start = time.time()
+        count = 0
+        pool = None
+        if self.workers > 1 and len(jobs) > 1:
+            pool = multiprocessing.Pool(self.workers)
+
+        try:
+            if pool is None:
+                rows = map(evaluate_job, jobs)
+            else:
+                rows = pool.imap_unordered(evaluate_job, jobs, chunksize=1)
+
+            with open(self.path, mode='a', newline='') as file:
+                writer = csv.writer(file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+                for row in rows:
+                    writer.writerow(row)
+                    file.flush()
+                    count += 1
+                    logging.info('\t%s : %d/%d (%.2f tasksets/s)' % (':'.join(row[:4]), count, len(jobs),
+                                                                     count / (time.time() - start)))
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        self.throughput = count / max(time.time() - start, 1e-9)
+        return count
+
+    def ratios(self):
+        # schedulable ratios by analysis and by simulation, per NoC setting, task number and load level
+        verdicts = dict()
+        for row in self.results():
+            verdict = verdicts.setdefault(tuple(row[:3]), [0, 0, 0])
+            verdict[0] += 1
+            verdict[1] += int(row[5])
+            verdict[2] += int(row[6])
+
+        ratios = []
+        for config, tasks, load in sorted(verdicts, key=lambda key: (key[0], int(key[1]), float(key[2]))):
+            count, analysis, simulation = verdicts[(config, tasks, load)]
+            ratios.append([config, int(tasks), float(load), count, round(analysis / count, 3),
+                           round(simulation / count, 3)])
+        return ratios
@@ -1,6 +1,6 @@
 import csv
 
-from analysis.end_to_end_latency import QinModel, TDMA
+from analysis.batch_latency import BatchQinModel, BatchTDMA
 
 
 class CSVWriter:
@@ -63,19 +63,19 @@ class CSVWriter:
             # File Header
             writer.writerow(header)
 
-            # compute wcla according to arbitration mode
+            # compute wcla according to arbitration mode, for the whole taskset at once
             if self.type == 'RR':
-                tdma = TDMA(self.noc, self.noc.vc_quantum)
+                tdma = BatchTDMA(self.noc, self.noc.vc_quantum)
+                latencies = tdma.latency(messages, tdma.slot_table[5])  # TODO : it's mapped manually
 
-                for msg in messages:
-                    latency = tdma.latency(msg, tdma.slot_table[5])  # TODO : it's mapped manually
+                for msg, latency in zip(messages, latencies.tolist()):
                     writer.writerow([msg.id, latency])
 
             elif self.type == 'PRIORITY_PREEMPT':
-                qinModel = QinModel(self.noc, messages)
+                qinModel = BatchQinModel(self.noc, messages)
+                latencies = qinModel.latency_nth()
 
-                for msg in messages:
-                    latency = qinModel.latency_nth(msg)
+                for msg, latency in zip(messages, latencies.tolist()):
                     writer.writerow([msg.id, latency])
 
     @staticmethod
@@ -2,16 +2,24 @@ import math
 import random
 import sys
 
+import numpy as np
 import yaml
 
 from communication import structure
 from communication.routing import Coordinate
-from communication.structure import Message
-from gen.unifast import Unifast
+from communication.structure import Message, link_utilization
+from gen.unifast import Unifast, BatchUnifast
+
+
+def job_random(seed, index):
+    # Generator of one job : the same master seed and job index give the same tasksets in any process
+    return random.Random('%s:%s' % (seed, index))
 
 
 class Generation:
-    def __init__(self):
+    def __init__(self, generator=None):
+        # random generator of the tasksets, the global one by default
+        self.random = random if generator is None else generator
         self._quantum_tab = []
         self.period_array = [1000, 1500, 2000, 3000, 4000, 6000]
         # self.offset_array = [0, 10, 15, 30, 60, 80]
@@ -19,6 +27,9 @@ class Generation:
         self.messages = []
         self.counter = 0
 
+    def set_random(self, generator):
+        self.random = generator
+
     def set_noc(self, noc):
         self.noc = noc
         self.noc.link_array_filling()
@@ -33,6 +44,9 @@ class Generation:
                 self._nbvc = data['noc']['numberOfVC']
                 self._vc_size = data['noc']['VCBufferSize']
                 self._arbitration = data['noc']['arbitration']
+                self._scheduling = data['noc'].get('scheduling', 'CYCLE')
+                self._fail_fast = data['noc'].get('failFast', False)
+                self._tiles = data['noc'].get('tiles', [2, 2])
 
                 # VC Quatum
                 quantum = data['quantum']
@@ -66,11 +80,11 @@ class Generation:
 
                         # set random priority (optional)
                         if self._arbitration == 'PRIORITY_PREEMPT' or self._arbitration == 'PRIORITY_NON_PREEMPT':
-                            priority = random.randint(0, self._nbvc - 1)
+                            priority = self.random.randint(0, self._nbvc - 1)
 
                         # Temporary :: Compute the deadline for our task
                         lower_bound = int(0.7 * period)
-                        deadline = random.randint(0, (period - lower_bound + 1) + lower_bound)
+                        deadline = self.random.randint(0, (period - lower_bound + 1) + lower_bound)
 
                         # Message Creation
                         message = Message(self.counter,
@@ -124,6 +138,15 @@ class Generation:
     def arbitration(self):
         return self._arbitration
 
+    def scheduling(self):
+        return self._scheduling
+
+    def fail_fast(self):
+        return self._fail_fast
+
+    def tiles(self):
+        return self._tiles
+
     # HyperPeriod Computation
     def gcd(self, a, b):
         while b != 0:
@@ -154,16 +177,16 @@ class Generation:
         # Loop
         while len(self._utilization_array) > 0:
             # generate parameters
-            utilization_factor = self._utilization_array.pop(random.randrange(len(self._utilization_array)))
-            period = self.period_array[random.randint(0, len(self.period_array) - 1)]
-            offset = self.offset_array[random.randint(0, len(self.offset_array) - 1)]
+            utilization_factor = self._utilization_array.pop(self.random.randrange(len(self._utilization_array)))
+            period = self.period_array[self.random.randint(0, len(self.period_array) - 1)]
+            offset = self.offset_array[self.random.randint(0, len(self.offset_array) - 1)]
             size = int(math.ceil(period * utilization_factor))
             lower_bound = int(load * period)
-            deadline = random.randint(0, (period - lower_bound + 1) + lower_bound)
+            deadline = self.random.randint(0, (period - lower_bound + 1) + lower_bound)
 
             # set random priority (optional)
-            if self._arbitration == 'Priority':
-                priority = random.randint(0, self._nbvc - 1)
+            if self._arbitration == 'PRIORITY_PREEMPT' or self._arbitration == 'PRIORITY_NON_PREEMPT':
+                priority = self.random.randint(0, self._nbvc - 1)
             else:
                 priority = -1
 
@@ -185,6 +208,47 @@ class Generation:
 
         return self.messages
 
+    # Generation : Unifast, for nb_set tasksets at once
+    def uunifast_batch(self, nb_set, nb_task, load):
+        """
+        Parameters of `nb_set` UUniFast tasksets of `nb_task` messages, as an integer array of shape
+        (nb_set, nb_task, 9) : period, size, offset, deadline, source row and column, destination row and
+        column, priority. The draws follow `uunifast_generate`, field by field over the whole batch, from a
+        NumPy generator seeded by the generator of the Generation; the priorities come last, so that the
+        other fields do not depend on the arbitration.
+        """
+        rng = np.random.default_rng(self.random.getrandbits(64))
+        shape = (nb_set, nb_task)
+
+        utilizations = BatchUnifast(nb_task, nb_set, 2, rng).UUniFastDiscard()
+        periods = np.array(self.period_array)[rng.integers(0, len(self.period_array), shape)]
+        offsets = np.array(self.offset_array)[rng.integers(0, len(self.offset_array), shape)]
+        sizes = np.ceil(periods * utilizations).astype(np.int64)
+        lower_bounds = (load * periods).astype(np.int64)
+        deadlines = rng.integers(0, (periods - lower_bounds + 1) + lower_bounds + 1)
+
+        # the destination differs from the source on both axes
+        src = rng.integers(0, self._square_size, shape + (2,))
+        dest = (src + rng.integers(1, self._square_size, shape + (2,))) % self._square_size
+
+        if self._arbitration == 'PRIORITY_PREEMPT' or self._arbitration == 'PRIORITY_NON_PREEMPT':
+            priorities = rng.integers(0, self._nbvc, shape)
+        else:
+            priorities = np.full(shape, -1)
+
+        return np.stack([periods, sizes, offsets, deadlines, src[..., 0], src[..., 1], dest[..., 0], dest[..., 1],
+                         priorities], axis=-1)
+
+    def taskset(self, parameters):
+        # Messages of a taskset drawn by uunifast_batch
+        self.messages = []
+        for counter, row in enumerate(np.asarray(parameters).tolist()):
+            period, size, offset, deadline, src_i, src_j, dest_i, dest_j, priority = row
+            self.messages.append(Message(counter, period, size, offset, deadline, Coordinate(src_i, src_j),
+                                         Coordinate(dest_i, dest_j), priority))
+        self.counter = len(self.messages)
+        return self.messages
+
     # Utilization Factors
     def get_utilization_factors(self, nb_task):
         """
@@ -204,22 +268,22 @@ class Generation:
             - `u`: Total utilization of the task set.
         Returns `nsets` of `n` task utilizations.
         """
-        unifast = Unifast(nb_task, 1, 2)
+        unifast = Unifast(nb_task, 1, 2, self.random)
         return unifast.UUniFastDiscard()
 
     def generate_random_coordinate(self):
 
         # source router coordinate
-        src_i = random.randint(0, self.noc.square_size - 1)
-        src_j = random.randint(0, self.noc.square_size - 1)
+        src_i = self.random.randint(0, self.noc.square_size - 1)
+        src_j = self.random.randint(0, self.noc.square_size - 1)
 
         # destination router coordinate
         dest_i = src_i
         dest_j = src_j
         while src_i == dest_i:
-            dest_i = random.randint(0, self.noc.square_size - 1)
+            dest_i = self.random.randint(0, self.noc.square_size - 1)
         while src_j == dest_j:
-            dest_j = random.randint(0, self.noc.square_size - 1)
+            dest_j = self.random.randint(0, self.noc.square_size - 1)
 
         return [Coordinate(src_i, src_j), Coordinate(dest_i, dest_j)]
 
@@ -228,8 +292,8 @@ class Generation:
     """
 
     def conflict_task_by_axe(self, message, max_rate, min_rate, error_rate):
-        # extract message XY routing coordinate
-        path1 = message.get_xy_path_coordinate(self.noc)
+        # extract message XY route
+        path1 = message.get_xy_path(self.noc)
 
         # loop : check if all message links are in the interval (between max and min rate)
         while True:
@@ -262,27 +326,19 @@ class Generation:
 
             # get conflict message data
             conflict_lu = conflict_message.get_link_utilization()
-            path2 = conflict_message.get_xy_path_coordinate(self.noc)
+            path2 = conflict_message.get_xy_path(self.noc)
 
             ####### print("PATH 2 : %s" % path2)
 
-            # add LU to link
-            for link in path2:
-                self.add_utilization_rate_to_link(link, conflict_lu)
+            # add LU to the links of the path
+            self.add_utilization_rate_to_path(path2, conflict_lu)
 
-    # This function provide us links which are outside [min_rate, max_rate]
+    # This function provide us links (of an XY path) which are outside [min_rate, max_rate]
     def find_links_outside_interval(self, path, max_rate, min_rate, error_rate):
-        outside_link = []
-
-        for p in path:
-            lu = self.noc.links[str(p[0])][str(p[1])]
-            if lu < (max_rate + error_rate) / 100 or \
-                    lu > (min_rate - error_rate) / 100:
-                ######## print('LU ADDED : %f' % lu)
-
-                outside_link.append(p)
+        lu = self.noc.links.path_rates(path)
+        outside = (lu < (max_rate + error_rate) / 100) | (lu > (min_rate - error_rate) / 100)
 
-        return outside_link
+        return [path.links[k] for k in np.flatnonzero(outside)]
 
     # This function aims to set the communication axe to conflict message
     def generate_conflict_task_by_axe(self, router, ids, axe, min_rate, offset):
@@ -316,29 +372,32 @@ class Generation:
     def generate_communicating_task_by_axe(self, min_rate, offset, src, dest):
         while True:
 
-            size = random.randint(structure.PACKET_DEFAULT_SIZE, structure.PACKET_DEFAULT_SIZE * 10)
-            period = self.period_array[random.randint(0, len(self.period_array) - 1)]
+            size = self.random.randint(structure.PACKET_DEFAULT_SIZE, structure.PACKET_DEFAULT_SIZE * 10)
+            period = self.period_array[self.random.randint(0, len(self.period_array) - 1)]
             lower_bound = int(0.7 * period)
             # deadline = random.randint(0, (period - lower_bound + 1) + lower_bound)
             deadline = period  # TODO : temporary Harmonic Taskset
 
-            priority = random.randint(0, self._nbvc - 1)
-            message = Message(self.counter, period, size, offset, deadline, src, dest, priority)
+            priority = self.random.randint(0, self._nbvc - 1)
 
-            # calculate message Lu
-            lu = message.get_link_utilization()
+            # calculate message Lu, before building its packets
+            lu = link_utilization(size, period)
 
             if lu > (min_rate / 100):
                 continue
             else:
                 break
 
-        return message
+        return Message(self.counter, period, size, offset, deadline, src, dest, priority)
 
     # function to add an utilization rate to a specified link
     def add_utilization_rate_to_link(self, link, utilization):
         self.noc.links[str(link[0])][str(link[1])] += utilization
 
+    # function to add an utilization rate to the links of an XY path
+    def add_utilization_rate_to_path(self, path, utilization):
+        self.noc.links.add(path, utilization)
+
     """
     NEW ALGORITHM : End
     """
@@ -371,7 +430,7 @@ class Generation:
     def direction_intersection(self, message):
         intersection = []
         # Getting XY route
-        path1 = message.get_xy_path_coordinate(self.noc)
+        path1 = message.get_xy_path(self.noc)
 
         # Exploring loop
         for msg in self.messages:
@@ -379,11 +438,8 @@ class Generation:
             if msg == message:
                 continue
 
-            # Getting XY route
-            path2 = msg.get_xy_path_coordinate(self.noc)
-
             # Testing the overlap (intersection)
-            if self.task_overlap(path1, path2):
+            if path1.intersects(msg.get_xy_path(self.noc)):
                 intersection.append(msg)
 
         return intersection
@@ -1,29 +1,80 @@
 class Trace:
-    def __init__(self, flit, start):
-        self.flit = flit
+    __slots__ = ('start', 'arrival')
+
+    def __init__(self, start):
         self.start = start
+        self.arrival = None
 
     def set_arrival(self, arrival):
         self.arrival = arrival
 
+    def latency(self):
+        if self.arrival is None:
+            return None
+        return self.arrival - self.start
+
 
 class TraceSet:
+    # Flit traces indexed by (message id, instance, packet id, flit id)
     def __init__(self):
-        self.set = []
+        self.set = dict()
+
+    @staticmethod
+    def flit_key(flit):
+        message = flit.packet.message
+        return message.id, message.instance, flit.packet.id, flit.id
 
-    def add_trace(self, trace):
-        self.set.append(trace)
+    def add_trace(self, key, trace):
+        self.set[key] = trace
+
+    def set_flit_injection(self, flit, start):
+        self.set[self.flit_key(flit)] = Trace(start)
 
     def set_flit_arrival(self, flit, arrival):
-        for trace in self.set:
-            if trace.flit == flit:
-                trace.set_arrival(arrival)
+        trace = self.set.get(self.flit_key(flit))
+        if trace is not None:
+            trace.set_arrival(arrival)
+
+    def get_trace(self, message_id, instance, packet_id, flit_id):
+        return self.set.get((message_id, instance, packet_id, flit_id))
+
+    def flit_latencies(self):
+        # latency of every arrived flit
+        latencies = dict()
+        for key, trace in self.set.items():
+            if trace.arrival is not None:
+                latencies[key] = trace.arrival - trace.start
+        return latencies
+
+    def packet_latencies(self):
+        # from the first flit injected to the last flit arrived, for fully arrived packets
+        starts = dict()
+        arrivals = dict()
+        in_flight = set()
+        for key, trace in self.set.items():
+            packet = key[:3]
+            starts[packet] = min(starts.get(packet, trace.start), trace.start)
+            if trace.arrival is None:
+                in_flight.add(packet)
+            else:
+                arrivals[packet] = max(arrivals.get(packet, trace.arrival), trace.arrival)
+
+        latencies = dict()
+        for packet, arrival in arrivals.items():
+            if packet not in in_flight:
+                latencies[packet] = arrival - starts[packet]
+        return latencies
+
+    def __len__(self):
+        return len(self.set)
 
     def __str__(self):
         stri = '-- [ '
-        for trace in self.set:
-            stri += '%s -- released at : %d -- arrived at : %d -- latency : %d' % \
-                    (trace.flit, trace.start, trace.arrival, trace.arrival - trace.start)
+        for key, trace in sorted(self.set.items()):
+            if trace.arrival is None:
+                continue
+            stri += 'Flit %d-%d-%d(%d) -- released at : %d -- arrived at : %d -- latency : %d' % \
+                    (key[3], key[2], key[0], key[1], trace.start, trace.arrival, trace.latency())
             stri += '\n'
 
         stri += ' ] --'
@@ -1,11 +1,14 @@
 import random
 
+import numpy as np
+
 
 class Unifast:
-    def __init__(self, nb_task, nb_set, u):
+    def __init__(self, nb_task, nb_set, u, generator=random):
         self.nb_task = nb_task
         self.nb_set = nb_set
         self.u = u
+        self.random = generator
 
     def UUniFastDiscard(self):
         sets = []
@@ -14,7 +17,7 @@ class Unifast:
             utilizations = []
             sumU = self.u
             for i in range(1, self.nb_task):
-                nextSumU = sumU * random.random() ** (1.0 / (self.nb_task - i))
+                nextSumU = sumU * self.random.random() ** (1.0 / (self.nb_task - i))
                 utilizations.append(sumU - nextSumU)
                 sumU = nextSumU
             utilizations.append(sumU)
@@ -24,3 +27,44 @@ class Unifast:
                 sets.append(utilizations)
 
         return sets[0]
+
+
+class BatchUnifast:
+    """
+    UUniFast-Discard over `nb_set` sets at once, drawn from a NumPy generator : the sets are rows of an
+    array, the discarded ones are drawn again as a whole batch until `nb_set` of them are kept.
+    """
+
+    def __init__(self, nb_task, nb_set, u, generator=None):
+        self.nb_task = nb_task
+        self.nb_set = nb_set
+        self.u = u
+        self.random = np.random.default_rng() if generator is None else generator
+
+    def UUniFast(self, count):
+        # remaining sums of the classic algorithm : u times the cumulated products of the draws
+        exponents = 1.0 / np.arange(self.nb_task - 1, 0, -1)
+        sums = self.u * np.cumprod(self.random.random((count, self.nb_task - 1)) ** exponents, axis=1)
+        bounds = np.hstack([np.full((count, 1), float(self.u)), sums, np.zeros((count, 1))])
+        return bounds[:, :-1] - bounds[:, 1:]
+
+    def UUniFastDiscard(self):
+        # no set can be kept when the utilizations cannot all be lower than 1
+        if self.u > self.nb_task or (self.nb_task > 1 and self.u == self.nb_task):
+            raise ValueError('UUniFast-Discard : utilization %s over %d tasks' % (self.u, self.nb_task))
+
+        sets = [np.empty((0, self.nb_task))]
+        kept = 0
+        drawn = 0
+        while kept < self.nb_set:
+            # the batch size follows the rate of kept sets so far
+            missing = self.nb_set - kept
+            count = min(int(missing * (drawn + 1) / (kept + 1)) + 1, 1 << 20)
+            candidates = self.UUniFast(count)
+            candidates = candidates[(candidates <= 1).all(axis=1)]
+
+            sets.append(candidates[:missing])
+            kept += len(sets[-1])
+            drawn += count
+
+        return np.vstack(sets)
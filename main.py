@@ -5,29 +5,37 @@ import sys
 import time
 
 import simpy
+import yaml
 
 from architecture.noc import NoC
+from engine import runner
+from engine.augmentation import AugmentationSearch
+from engine.cache import ResultCache
+from engine.sweep import Sweep, RATIO_HEADER, load_range
 from gen.csv_writer import CSVWriter
-from gen.generation import Generation
+from gen.generation import Generation, job_random
 
+CACHE_DIRECTORY = '.cache/results'
+SWEEP_FILE = 'input/sweep.yml'
+SWEEP_RESULT = 'input/result_sweep.csv'
 
-def main1():
-    # Create the SimPy environment. This is the thing that runs the simulation.
-    env = simpy.Environment()
-
-    # parse input files
-    input_files = os.popen("ls input").read().split('\n')
-    del input_files[-1]
 
+def main1():
     # CLI Argument parsing
-    level = 0
+    level = logging.WARNING
+    workers = 1
+    bypass = False
+    seed = None
     try:
-        options, args = getopt.getopt(sys.argv[1:], 'dimu:')
+        options, args = getopt.getopt(sys.argv[1:], 'dimnu:j:s:')
     except getopt.error as msg:
         sys.stdout = sys.stderr
         print(msg)
-        print("""usage: %s [-d|-i] [-u|-m|-]
-                -d, -i: DEBUG / INFO """ % sys.argv[0])
+        print("""usage: %s [-d|-i] [-j workers] [-n] [-s seed] [-u|-m|-]
+                -d, -i: DEBUG / INFO
+                -j: number of scenario directories simulated in parallel
+                -n: simulate again instead of reading the result cache
+                -s: master seed of the taskset generation """ % sys.argv[0])
         sys.exit()
 
     for opt, value in options:
@@ -35,97 +43,47 @@ def main1():
             level = logging.DEBUG
         if opt in '-i':
             level = logging.INFO
+        if opt in '-j':
+            workers = int(value)
+        if opt in '-n':
+            bypass = True
+        if opt in '-s':
+            seed = value
 
-    # file parsing loop
-    for file in input_files:
-        # NoC Settings
-        generation = Generation()
-        generation.config('input/' + file + '/config.yml')
+    logging.basicConfig(level=level,
+                        handlers=[
+                            # logging.FileHandler('input/' + file + '/output.log'),
+                            logging.StreamHandler()
+                        ])
 
-        square_size = generation.square_size()
-        nbvc = generation.nbvc()
-        vc_size = generation.vc_size()
-        vc_quantum = generation.vc_quantum()
-        arbitration = generation.arbitration()
+    logging.info('###################################################################')
+    logging.info('### ReTiNAS - Real-Time Network-on-chip Analysis and Simulation ###')
 
-        noc = NoC(env, 'Network-On-Chip', square_size, nbvc, vc_size, vc_quantum)
+    # every input directory is simulated with its own environment, possibly in parallel
+    cache = ResultCache(CACHE_DIRECTORY, bypass=bypass)
+    summary = runner.run(runner.input_directories('input'), workers, level, cache, seed)
 
-        generation.set_noc(noc)
-
-        # Messages generation
-        messages = generation.scenario('input/' + file + '/scenario.yml')
-        print("Taskset : %d" % len(messages))
-        print("HP : %d" % generation.hyperperiod())
-        # set logging level + log file
-        logging.basicConfig(level=level,
-                            handlers=[
-                                # logging.FileHandler('input/' + file + '/output.log'),
-                                logging.StreamHandler()
-                            ])
-
-        logging.info('###################################################################')
-        logging.info('### ReTiNAS - Real-Time Network-on-chip Analysis and Simulation ###')
-        logging.info('------ NoC Configuration ------')
-        logging.info('\tDimension : %d x %d' % (square_size, square_size))
-        logging.info('\tVC Number per Input : %d' % nbvc)
-        logging.info('\tVC Buffer size : %d' % vc_size)
-        logging.info('\tVC Quantum setting : %s' % vc_quantum)
-        logging.info('\tArbitration Policy : %s' % arbitration)
-        logging.info('-------------------------------')
-
-        """
-        Analysis : Begin
-        """
-        csv = CSVWriter(messages, arbitration, noc)
-        csv.analysis_trace_csv('input/' + file + '/result_analysis.csv', messages)
-        """
-        Analysis : End
-        """
-
-        """
-        Simulation : Begin
-        """
-        # Simulator Settings
-        noc.messages = messages
-        noc.arbitration = arbitration
-
-        for msg in messages:
-            print(msg)
-        # Starting Simulation
-        logging.info('### Simulation --> START - hyperperiod : %d ###' % generation.hyperperiod())
-        env.run(until=generation.hyperperiod())
-        # env.run(until=20)
-        logging.info('### Simulation --> END ###')
-
-        # printing
-        messages_i = noc.messages_instance
-        csv = CSVWriter(messages_i, 0, noc)
-
-        """
-        Simulation : End
-        """
-
-        # Trace generation : Latency
-        # for msgi in messages_i:
-        #     print("%s ---> Sched :: %s" % (msgi, msgi.is_deadline_met()))
-
-        csv.simulation_trace_csv('input/' + file + '/result_sim.csv')
+    runner.summary_trace_csv('input/result_summary.csv', summary)
+    print(runner.summary_table(summary))
 
 
 def main_resource_augmentation():
     # parse input files
-    input_files = os.popen("ls input").read().split('\n')
-    del input_files[-1]
+    input_files = [os.path.basename(directory) for directory in runner.input_directories('input')]
 
     # CLI Argument parsing
-    level = 0
+    level = logging.WARNING
+    workers = 1
+    seed = None
     try:
-        options, args = getopt.getopt(sys.argv[1:], 'dimu:')
+        options, args = getopt.getopt(sys.argv[1:], 'dimu:j:s:')
     except getopt.error as msg:
         sys.stdout = sys.stderr
         print(msg)
-        print("""usage: %s [-d|-i] [-u|-m|-]
-                -d, -i: DEBUG / INFO """ % sys.argv[0])
+        print("""usage: %s [-d|-i] [-j workers] [-s seed] [-u|-m|-]
+                -d, -i: DEBUG / INFO
+                -j: number of VC settings simulated in parallel
+                -s: master seed of the taskset generation """ % sys.argv[0])
         sys.exit()
 
     for opt, value in options:
@@ -133,6 +91,10 @@ def main_resource_augmentation():
             level = logging.DEBUG
         if opt in '-i':
             level = logging.INFO
+        if opt in '-j':
+            workers = int(value)
+        if opt in '-s':
+            seed = value
 
     # file parsing loop
     for file in input_files:
@@ -145,6 +107,7 @@ def main_resource_augmentation():
         vc_size = generation.vc_size()
         vc_quantum = generation.vc_quantum()
         arbitration = generation.arbitration()
+        scheduling = generation.scheduling()
 
         # Messages generation
         # messages = generation.scenario('input/' + file + '/scenario.yml')
@@ -165,58 +128,86 @@ def main_resource_augmentation():
         logging.info('\tVC Buffer size : %d' % vc_size)
         logging.info('\tVC Quantum setting : %s' % vc_quantum)
         logging.info('\tArbitration Policy : %s' % arbitration)
+        logging.info('\tScheduling : %s' % scheduling)
         logging.info('-------------------------------')
 
         # Starting Simulation
         tab = []
         for count in range(5):
-            messages = None
-            nbvc = generation.nbvc() - 1
-            vc_quantum = generation.vc_quantum()
-            vc_quantum.pop()
-            while True:
-                # Create the SimPy environment. This is the thing that runs the simulation.
-                env = simpy.Environment()
-
-                nbvc += 1
-                vc_quantum.append(1)
-                noc = NoC(env, 'Network-On-Chip', square_size, nbvc, vc_size, vc_quantum)
-                generation.set_noc(noc)
-
-                # Messages generation
-                if messages is None:
-                    print("GENERATION ----------------------------------")
-                    messages = generation.scenario('input/' + file + '/scenario.yml')
-                # Simulator Settings
-                noc.messages = messages
-
-                ##################  1 - RR  ##################
-                noc.arbitration = arbitration
-
-                logging.info('### Simulation --> START - hyperperiod : %d ###' % generation.hyperperiod())
-                env.run(until=generation.hyperperiod())
-                # env.run(until=20)
-                logging.info('### Simulation --> END ###')
-
-                # printing
-                messages_i = noc.messages_instance
-                csv = CSVWriter(messages_i, 0, noc)
-
-                """
-                Simulation : End
-                """
-                if is_taskset_deadline_meeting(messages_i):
-                    print(">>>>>>>>>>>>>>>>> FINAL :: NUMBER OF VCS : %d" % len(noc.router_matrix[0][0].inNorth.vcs))
-                    tab.append(len(noc.router_matrix[0][0].inNorth.vcs))
-                    break
-                else:
-                    # TODO : RA
-                    print(">>>>>>>>>>>>>>>>> NUMBER OF VCS : %d" % len(noc.router_matrix[0][0].inNorth.vcs))
-                    continue
+            # Messages generation, on a NoC of the configured size
+            generation.set_noc(NoC(simpy.Environment(), 'Network-On-Chip', square_size, generation.nbvc(), vc_size,
+                                   vc_quantum, scheduling))
+            if seed is not None:
+                generation.set_random(job_random(seed, '%s:%d' % (file, count)))
+            print("GENERATION ----------------------------------")
+            messages = generation.scenario('input/' + file + '/scenario.yml')
+
+            # minimal VC number : bracketing then narrowing, candidates stop at their first deadline miss
+            search = AugmentationSearch(generation, messages, workers)
+            nbvc = search.search()
+
+            for number, schedulable in sorted(search.results.items()):
+                if not schedulable:
+                    print(">>>>>>>>>>>>>>>>> NUMBER OF VCS : %d" % number)
+
+            if nbvc is None:
+                print(">>>>>>>>>>>>>>>>> NOT SCHEDULABLE UP TO %d VCS" % search.limit)
+                continue
+            print(">>>>>>>>>>>>>>>>> FINAL :: NUMBER OF VCS : %d" % nbvc)
+            tab.append(nbvc)
 
         CSVWriter.resource_augmentation_trace_csv('input/' + file + '/resource_augmentation.csv', tab)
 
 
+def main_sweep():
+    # CLI Argument parsing
+    level = logging.WARNING
+    workers = 1
+    restart = False
+    seed = 0
+    try:
+        options, args = getopt.getopt(sys.argv[1:], 'dinj:s:')
+    except getopt.error as msg:
+        sys.stdout = sys.stderr
+        print(msg)
+        print("""usage: %s [-d|-i] [-j workers] [-n] [-s seed]
+                -d, -i: DEBUG / INFO
+                -j: number of tasksets evaluated in parallel
+                -n: start the sweep again instead of resuming it
+                -s: master seed of the taskset generation """ % sys.argv[0])
+        sys.exit()
+
+    for opt, value in options:
+        if opt in '-d':
+            level = logging.DEBUG
+        if opt in '-i':
+            level = logging.INFO
+        if opt in '-j':
+            workers = int(value)
+        if opt in '-n':
+            restart = True
+        if opt in '-s':
+            seed = value
+
+    logging.basicConfig(level=level, handlers=[logging.StreamHandler()])
+
+    with open(SWEEP_FILE, 'r') as stream:
+        data = yaml.safe_load(stream)
+
+    if restart and os.path.isfile(SWEEP_RESULT):
+        os.remove(SWEEP_RESULT)
+
+    load = data['load']
+    sweep = Sweep(data['configs'], data['tasks'], load_range(load['min'], load['max'], load['step']),
+                  data['samples'], SWEEP_RESULT, workers, seed)
+    count = sweep.run()
+    print('%d tasksets evaluated (%.2f tasksets/s)' % (count, sweep.throughput))
+
+    ratios = sweep.ratios()
+    runner.summary_trace_csv('input/result_sweep_ratio.csv', ratios, RATIO_HEADER)
+    print(runner.summary_table(ratios, RATIO_HEADER))
+
+
 def is_taskset_deadline_meeting(messages):
     for msg in messages:
         # if msg.is_deadline_met() is None:
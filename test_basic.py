@@ -1,11 +1,71 @@
+import functools
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
 import unittest
+from multiprocessing import shared_memory
 
-from analysis.end_to_end_latency import QinModel, TDMA
+import numpy as np
+import simpy
+
+from analysis.batch_latency import BatchQinModel, BatchTDMA
+from analysis.end_to_end_latency import QinModel, TDMA, IncrementalQinModel
+from architecture.array_noc import ArrayNoC
+from architecture.partitioned_noc import PartitionedNoC
 from architecture.noc import NoC
+from architecture.request_queue import RequestQueue
 from architecture.virtual_channel import VirtualChannel
 from communication.routing import Coordinate, Direction
-from communication.structure import Packet, Message, FlitType, NodeArray, Node, Link
-from gen.generation import Generation
+from communication.structure import Packet, Message, MessageInstance, FlitType, NodeArray, Node, Link, \
+    PACKET_DEFAULT_SIZE, FLIT_DEFAULT_SIZE
+from engine import runner
+from engine.augmentation import AugmentationSearch
+from engine.cache import ResultCache
+from engine.event import Event
+from engine.event_list import EventList, EventType
+from engine.sweep import Sweep, load_range
+from gen.generation import Generation, job_random
+from gen.unifast import BatchUnifast
+
+
+def fixture_messages(number=4):
+    # the first `number` messages of the 4x4 mesh fixture
+    return [Message(1, 100, 640, 0, 100, Coordinate(0, 0), Coordinate(2, 3), 0),
+            Message(2, 200, 960, 0, 200, Coordinate(0, 1), Coordinate(3, 3), 1),
+            Message(3, 100, 320, 0, 100, Coordinate(1, 0), Coordinate(1, 3), 2),
+            Message(4, 400, 1280, 0, 400, Coordinate(3, 3), Coordinate(0, 0), 3),
+            Message(5, 150, 1600, 7, 150, Coordinate(2, 3), Coordinate(0, 0), 0),
+            Message(6, 100, 640, 3, 100, Coordinate(3, 0), Coordinate(0, 3), 0)][:number]
+
+
+def fixture_noc(arbitration, scheduling='CYCLE', messages=None):
+    # 4x4 mesh of 4 VCs of 10 flits, loaded with the fixture messages by default
+    noc = NoC(simpy.Environment(), "Network-On-Chip", 4, 4, 10, [1, 1, 1, 1], scheduling)
+    noc.messages = fixture_messages() if messages is None else messages
+    noc.arbitration = arbitration
+    return noc
+
+
+def write_scenario(directory, config, scenario=None):
+    # config.yml and scenario.yml of a simulation directory, created if missing
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'config.yml'), 'w') as file:
+        file.write(config)
+    if scenario is not None:
+        with open(os.path.join(directory, 'scenario.yml'), 'w') as file:
+            file.write(scenario)
+    return directory
+
+
+def scenario_directory(test, config=None, scenario=None):
+    # temporary simulation directory, removed at the end of the test
+    root = tempfile.TemporaryDirectory()
+    test.addCleanup(root.cleanup)
+    if config is not None:
+        write_scenario(root.name, config, scenario)
+    return root.name
 
 
 class TestPacket(unittest.TestCase):
@@ -35,6 +95,53 @@ class TestPacket(unittest.TestCase):
     #     self.assertEqual(self.packet.flits[3].destination, self.dest)
 
 
+class TestMessageInstance(unittest.TestCase):
+
+    def setUp(self):
+        self.message = Message(1, 100, 640, 0, 100, Coordinate(0, 0), Coordinate(1, 2), 2)
+
+    def test_instance_settings(self):
+        instance = MessageInstance(self.message, 3)
+
+        self.assertEqual(instance.instance, 3)
+        self.assertEqual(instance.size, 640)
+        self.assertEqual(len(instance.packets), 2)
+        self.assertEqual(len(instance.packets[1].flits), 10)
+        self.assertIs(instance.packets[1].message, instance)
+        self.assertEqual(instance.packets[1].flits[9].type, FlitType.tail)
+        self.assertEqual(instance.packets[1].flits[9].priority, 2)
+        self.assertIs(instance.packets[1].flits[9].destination, self.message.dest)
+
+    def test_packet_recycling(self):
+        instance = MessageInstance(self.message, 0)
+        packets = instance.packets
+        for flit in packets[0].flits:
+            flit.timestamp = 12
+
+        # delivered in reverse order
+        self.message.recycle_packet(packets[1])
+        self.message.recycle_packet(packets[0])
+
+        new_instance = MessageInstance(self.message, 1)
+
+        self.assertEqual(len(self.message.packet_pool), 0)
+        self.assertEqual(set(map(id, new_instance.packets)), set(map(id, packets)))
+        self.assertEqual([packet.id for packet in new_instance.packets], [0, 1])
+        for packet in new_instance.packets:
+            self.assertIs(packet.message, new_instance)
+            for flit in packet.flits:
+                self.assertEqual(flit.timestamp, -1)
+
+    def test_simulation_recycling(self):
+        noc = fixture_noc('RR', 'ACTIVITY', [self.message])
+        noc.env.run(until=350)
+
+        # every delivered packet went back to the pool and was reused
+        self.assertEqual(len(noc.messages_instance), 4)
+        self.assertEqual(len(self.message.packet_pool), 2)
+        self.assertEqual(noc.router_matrix[1][2].proc_engine.nb_received_flits, 80)
+
+
 class TestNoC(unittest.TestCase):
 
     def setUp(self):
@@ -96,6 +203,60 @@ class TestLink(unittest.TestCase):
         self.assertEqual(self.noc.links['1']['2'], 0)
 
 
+class TestLinkUtilization(unittest.TestCase):
+
+    def setUp(self):
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 3, 4, 12, [1, 1, 1, 1])
+        self.noc.link_array_filling()
+
+    def test_links_view(self):
+        self.assertEqual(len(self.noc.links.keys()), 9)
+        self.assertEqual(sorted(self.noc.links['5']), ['2', '4', '6', '8'])
+        self.assertEqual(list(self.noc.links['1']), ['4', '2'])
+        self.assertRaises(KeyError, lambda: self.noc.links['3']['4'])
+        self.assertRaises(KeyError, lambda: self.noc.links['10'])
+
+        self.noc.links['5']['6'] += 0.25
+        self.assertEqual(self.noc.links['5']['6'], 0.25)
+        self.assertEqual(self.noc.links['6']['5'], 0)
+
+        self.noc.link_array_clean()
+        self.assertEqual(self.noc.links.rates.sum(), 0)
+
+    def test_path_utilization(self):
+        # the flat rates are indexed by the XY path link ids
+        path = self.noc.xy_path(Coordinate(0, 0), Coordinate(2, 2))
+        self.noc.links.add(path, 0.5)
+        self.noc.links.add(self.noc.xy_path(Coordinate(0, 1), Coordinate(1, 2)), 0.25)
+
+        self.assertEqual([self.noc.links[str(src)][str(dest)] for src, dest in path.links], [0.5, 0.75, 0.75, 0.5])
+        self.assertEqual(self.noc.links.path_rates(path).tolist(), [0.5, 0.75, 0.75, 0.5])
+        self.assertEqual(self.noc.links.rates.sum(), 2.5)
+
+    def test_router_coordinate(self):
+        self.assertEqual(self.noc.get_router_coordinate_by_id(6), self.noc.router_matrix[1][2].coordinate)
+        self.assertIsNone(self.noc.get_router_coordinate_by_id(10))
+
+    def test_conflict_tasks(self):
+        generation = Generation(job_random(7, 0))
+        generation._square_size = 3
+        generation._nbvc = 4
+        generation.set_noc(self.noc)
+        message = Message(0, 1000, 640, 0, 1000, Coordinate(0, 0), Coordinate(2, 2), 0)
+        generation.messages.append(message)
+        generation.counter = 1
+
+        generation.conflict_task_by_axe(message, 60, 50, 0)
+
+        # the links of the message are loaded into [50%, 60%] by conflict tasks on their axis
+        path = message.get_xy_path(self.noc)
+        self.assertEqual(generation.find_links_outside_interval(path, 50, 60, 0), [])
+        self.assertGreater(len(generation.messages), 1)
+        for conflict in generation.messages[1:]:
+            self.assertTrue(conflict.src.i == conflict.dest.i or conflict.src.j == conflict.dest.j)
+            self.assertLessEqual(conflict.get_link_utilization(), 0.5)
+
+
 class TestRouter(unittest.TestCase):
 
     def setUp(self):
@@ -197,6 +358,152 @@ class TestRouting(unittest.TestCase):
         self.assertEqual(len(self.router.vcs_target_west), 1)
 
 
+class TestVirtualChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.vc = VirtualChannel(0, Direction.north, None, 4, 1)
+        self.flits = Packet(0, Coordinate(1, 1), Message(1, 23, 256, 0, 0, Coordinate(0, 0), Coordinate(1, 1))).flits
+
+    def test_fifo_order(self):
+        for flit in self.flits[:4]:
+            self.assertTrue(self.vc.enqueue(flit))
+
+        self.assertFalse(self.vc.enqueue(self.flits[4]))
+        self.assertEqual(len(self.vc.flits), 4)
+        self.assertIs(self.vc.head(), self.flits[0])
+        self.assertIs(self.vc.tail(), self.flits[3])
+
+        self.assertIs(self.vc.dequeue(), self.flits[0])
+        self.assertIs(self.vc.dequeue(), self.flits[1])
+        self.assertEqual(len(self.vc.flits), 2)
+
+    def test_restore(self):
+        self.vc.enqueue(self.flits[0])
+        self.vc.enqueue(self.flits[1])
+
+        flit = self.vc.dequeue()
+        self.vc.restore(flit)
+
+        self.assertIs(self.vc.head(), self.flits[0])
+        self.assertEqual(list(self.vc.flits), self.flits[:2])
+
+    def test_wrap_around(self):
+        for i in range(10):
+            self.assertTrue(self.vc.enqueue(self.flits[i]))
+            if i >= 2:
+                self.assertIs(self.vc.dequeue(), self.flits[i - 2])
+
+        self.assertEqual(list(self.vc.flits), self.flits[8:10])
+        self.assertIs(self.vc.dequeue(), self.flits[8])
+        self.assertIs(self.vc.dequeue(), self.flits[9])
+        self.assertIsNone(self.vc.dequeue())
+        self.assertIsNone(self.vc.head())
+        self.assertIsNone(self.vc.tail())
+
+
+class TestRequestQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 3, 2, 10, [1, 1])
+        self.router = self.noc.router_matrix[1][1]
+        self.flits = Packet(0, Coordinate(1, 2), Message(1, 100, 320, 0, 100, Coordinate(1, 0), Coordinate(1, 2))).flits
+
+    def test_queue(self):
+        queue = RequestQueue()
+        vcs = [VirtualChannel(i, Direction.north, None, 4, 1) for i in range(3)]
+        for vc in vcs:
+            queue.append(vc)
+
+        self.assertIs(queue.popleft(), vcs[0])
+        self.assertNotIn(vcs[0], queue)
+        queue.appendleft(vcs[0])
+        queue.remove(vcs[1])
+        self.assertEqual(list(queue), [vcs[0], vcs[2]])
+        self.assertEqual(len(queue), 2)
+
+    def test_vc_request(self):
+        self.assertTrue(self.router.is_idle())
+
+        west_vc = self.router.inWest.vcs[1]
+        pe_vc = self.router.inPE.vcs[0]
+        west_vc.enqueue(self.flits[0])
+        west_vc.enqueue(self.flits[1])
+        pe_vc.enqueue(self.flits[2])
+
+        self.assertEqual(self.router.vcs_pending, {west_vc, pe_vc})
+        self.assertFalse(self.router.is_idle())
+
+        # requests join the outport queue in the InPort scan order
+        self.router.vc_election()
+        self.assertEqual(list(self.router.vcs_target_east), [pe_vc, west_vc])
+        self.assertEqual(len(self.router.vcs_pending), 0)
+
+        self.router.vcs_target_east.clear()
+        self.assertTrue(self.router.is_idle())
+
+
+class TestPathCache(unittest.TestCase):
+
+    def setUp(self):
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 4, 2, 10, [1, 1])
+        self.message = Message(1, 100, 320, 0, 100, Coordinate(0, 0), Coordinate(3, 2))
+
+    def test_xy_path(self):
+        path = self.message.get_xy_path(self.noc)
+
+        self.assertEqual(path.links, ((1, 2), (2, 3), (3, 7), (7, 11), (11, 15)))
+        self.assertEqual(list(path.ids), [2, 6, 9, 25, 41])
+        self.assertEqual(len(path), 5)
+        self.assertIs(self.noc.xy_path(Coordinate(0, 0), Coordinate(3, 2)), path)
+
+    def test_intersection(self):
+        path = self.message.get_xy_path(self.noc)
+
+        # same links, opposite directions
+        self.assertFalse(path.intersects(self.noc.xy_path(Coordinate(3, 2), Coordinate(0, 0))))
+        self.assertTrue(path.intersects(self.noc.xy_path(Coordinate(0, 1), Coordinate(1, 2))))
+        self.assertFalse(path.intersects(self.noc.xy_path(Coordinate(1, 0), Coordinate(1, 1))))
+
+
+class TestRoutingTable(unittest.TestCase):
+
+    def setUp(self):
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 5, 2, 10, [1, 1])
+
+    def xy_outport(self, router, dest):
+        if router.coordinate.j > dest.j:
+            return router.outWest
+        elif router.coordinate.j < dest.j:
+            return router.outEast
+        elif router.coordinate.i > dest.i:
+            return router.outNorth
+        elif router.coordinate.i < dest.i:
+            return router.outSouth
+        return router.outPE
+
+    def test_routing_table(self):
+        for line in self.noc.router_matrix:
+            for router in line:
+                # linear in the mesh size
+                self.assertEqual(len(router.column_table), 5)
+                self.assertEqual(len(router.row_table), 5)
+                for i in range(5):
+                    for j in range(5):
+                        message = Message(1, 100, 320, 0, 100, Coordinate(0, 0), Coordinate(i, j))
+                        self.assertIs(router.route_computation(message.packets[0].flits[0]),
+                                      self.xy_outport(router, message.dest))
+
+    def test_flit_destination(self):
+        message = Message(1, 100, 320, 0, 100, Coordinate(0, 0), Coordinate(3, 4))
+        flit = message.packets[0].flits[0]
+        router = self.noc.router_matrix[3][1]
+
+        self.assertIs(router.route_computation(flit), router.outEast)
+
+        flit.set_destination_info(Coordinate(1, 1))
+        self.assertIs(router.route_computation(flit), router.outNorth)
+
+
 class TestNode(unittest.TestCase):
 
     def setUp(self):
@@ -356,6 +663,740 @@ Priority Arbitration Test
 #         self.assertEqual(router.get_vc_candidate(candidates), router.inNorth.vcs[1])
 
 
+class TestActivityScheduling(unittest.TestCase):
+
+    def simulate(self, arbitration, scheduling):
+        noc = fixture_noc(arbitration, scheduling)
+        noc.env.run(until=400)
+
+        return [(mi.id, mi.instance, mi.get_latency()) for mi in noc.messages_instance]
+
+    def test_rr_latencies(self):
+        latencies = self.simulate('RR', 'ACTIVITY')
+
+        self.assertEqual(len(latencies), 11)
+        self.assertEqual(latencies, self.simulate('RR', 'CYCLE'))
+
+    def test_priority_preemptive_latencies(self):
+        latencies = self.simulate('PRIORITY_PREEMPT', 'ACTIVITY')
+
+        self.assertEqual(len(latencies), 11)
+        self.assertEqual(latencies, self.simulate('PRIORITY_PREEMPT', 'CYCLE'))
+
+    def test_idle_network(self):
+        noc = fixture_noc('RR', 'ACTIVITY', [Message(1, 1000, 320, 0, 1000, Coordinate(0, 0), Coordinate(0, 1), 0)])
+        noc.env.run(until=500)
+
+        self.assertEqual(noc.messages_instance[0].get_latency(), 12)
+        self.assertEqual(len(noc.active_routers), 0)
+        self.assertEqual(len(noc.active_pes), 0)
+
+
+class TestArrayNoC(unittest.TestCase):
+
+    def compare(self, arbitration, nbvc, vc_size, vc_quantum, until=400):
+        env = simpy.Environment()
+        noc = NoC(env, "Network-On-Chip", 4, nbvc, vc_size, vc_quantum)
+        noc.messages = fixture_messages(6)
+        noc.arbitration = arbitration
+        env.run(until=until)
+
+        array_noc = ArrayNoC(4, nbvc, vc_size, vc_quantum)
+        array_noc.messages = fixture_messages(6)
+        array_noc.arbitration = arbitration
+        messages_instance = array_noc.run(until)
+
+        self.assertEqual(len(messages_instance), 18)
+        self.assertEqual([(mi.id, mi.instance, mi._depart_time, mi._arrival_time) for mi in messages_instance],
+                         [(mi.id, mi.instance, mi._depart_time, mi._arrival_time) for mi in noc.messages_instance])
+
+    def test_rr_latencies(self):
+        self.compare('RR', 4, 10, [1, 1, 1, 1])
+        self.compare('RR', 2, 12, [3, 1])
+
+    def test_priority_preemptive_latencies(self):
+        self.compare('PRIORITY_PREEMPT', 4, 10, [1, 1, 1, 1])
+        self.compare('PRIORITY_PREEMPT', 4, 4, [1, 1, 1, 1])
+
+    def test_runner(self):
+        # a seeded directory gets the same taskset, and the same results as with the polling engine
+        summary = []
+        for scheduling in ['ARRAY', 'CYCLE']:
+            config = TestRunner.CONFIG.replace("VCBufferSize: 4\n",
+                                               "VCBufferSize: 10\n  scheduling: '%s'\n" % scheduling)
+            directory = write_scenario(os.path.join(scenario_directory(self), 'scenario'), config,
+                                       "task: 6\nmethod: UuniFast\nload: 0.7\n")
+            summary.append(runner.run([directory], seed=3)[0])
+
+        self.assertEqual(summary[0][1:-1], summary[1][1:-1])
+        self.assertGreater(summary[0][4], 0)
+
+
+class TestPartitionedNoC(unittest.TestCase):
+
+    def compare(self, arbitration, tiles, until=400):
+        array_noc = ArrayNoC(4, 4, 10, [1, 1, 1, 1])
+        array_noc.messages = fixture_messages(6)
+        array_noc.arbitration = arbitration
+        expected = array_noc.run(until)
+
+        partitioned_noc = PartitionedNoC(4, 4, 10, [1, 1, 1, 1], tiles)
+        partitioned_noc.messages = fixture_messages(6)
+        partitioned_noc.arbitration = arbitration
+        # shared memory is only held during a run
+        self.assertEqual(partitioned_noc.blocks, [])
+        messages_instance = partitioned_noc.run(until)
+
+        self.assertEqual([(mi.id, mi.instance, mi._depart_time, mi._arrival_time) for mi in messages_instance],
+                         [(mi.id, mi.instance, mi._depart_time, mi._arrival_time) for mi in expected])
+        # the shared memory is freed, the state is kept
+        self.assertEqual(partitioned_noc.blocks, [])
+        self.assertGreater(partitioned_noc.arrival.max(), 0)
+
+    def test_rr_latencies(self):
+        self.compare('RR', (2, 2))
+        self.compare('RR', (3, 2))
+
+    def test_priority_preemptive_latencies(self):
+        self.compare('PRIORITY_PREEMPT', (2, 2))
+        self.compare('PRIORITY_PREEMPT', (1, 3))
+
+    def test_memory_release(self):
+        noc = PartitionedNoC(4, 4, 10, [1, 1, 1, 1])
+        noc.messages = fixture_messages(6)
+        noc.arbitration = 'RR'
+        names = []
+
+        def failing_sharing():
+            PartitionedNoC.memory_sharing(noc)
+            names.extend(memory.name for name, memory in noc.blocks)
+            raise MemoryError()
+
+        # a run failing once the state is shared still frees the shared memory
+        noc.memory_sharing = failing_sharing
+        self.assertRaises(MemoryError, noc.run, 400)
+        self.assertEqual(noc.blocks, [])
+        self.assertGreater(len(names), 0)
+        for name in names:
+            self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+
+class TestWormholeReservation(unittest.TestCase):
+
+    def simulate(self, arbitration):
+        noc = fixture_noc(arbitration)
+
+        for now in range(1, 400):
+            noc.env.run(until=now)
+
+            # a locked VC is reserved by at most one upstream VC
+            reserved = []
+            for line in noc.router_matrix:
+                for router in line:
+                    for inport in (router.inPE, router.inNorth, router.inSouth, router.inEast, router.inWest):
+                        for vc in inport.vcs:
+                            if vc.next_hop is not None:
+                                self.assertTrue(vc.lock)
+                                self.assertTrue(vc.next_hop.lock)
+                                reserved.append(vc.next_hop)
+            self.assertEqual(len(reserved), len(set(reserved)))
+
+        return [mi.get_latency() for mi in noc.messages_instance]
+
+    def test_rr_reservations(self):
+        self.assertEqual(self.simulate('RR'), [40, 56, 14, 47, 26, 14, 40, 56, 14, 26, 14])
+
+    def test_priority_preemptive_reservations(self):
+        self.assertEqual(self.simulate('PRIORITY_PREEMPT'), [27, 58, 14, 47, 27, 14, 27, 58, 14, 27, 14])
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger(' ')
+        self.level = self.logger.level
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 2, 2, 10, [1, 1])
+        self.noc.messages = []
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+
+    def test_level_read_at_start(self):
+        self.logger.setLevel(logging.WARNING)
+        self.noc.env.run(until=1)
+        router = self.noc.router_matrix[0][0]
+        self.assertFalse(router.trace_info)
+        self.assertFalse(router.trace_debug)
+
+        self.logger.setLevel(logging.INFO)
+        self.noc.tracing_setting()
+        self.assertTrue(router.trace_info)
+        self.assertFalse(router.trace_debug)
+
+
+class TestTraceSet(unittest.TestCase):
+
+    def test_flit_traces(self):
+        noc = fixture_noc('RR', messages=fixture_messages(2))
+        noc.flit_tracing_setting()
+        noc.env.run(until=400)
+
+        nb_flit = PACKET_DEFAULT_SIZE // FLIT_DEFAULT_SIZE
+        for mi in noc.messages_instance:
+            nb_packet = mi.size // PACKET_DEFAULT_SIZE
+            first = noc.traceset.get_trace(mi.id, mi.instance, 0, 0)
+            last = noc.traceset.get_trace(mi.id, mi.instance, nb_packet - 1, nb_flit - 1)
+
+            self.assertEqual(first.start, mi._depart_time)
+            self.assertEqual(last.arrival + 1 - first.start, mi.get_latency())
+
+        packets = noc.traceset.packet_latencies()
+        self.assertEqual(len(noc.traceset.flit_latencies()), len(packets) * nb_flit)
+        self.assertEqual(len(packets), sum(mi.size // PACKET_DEFAULT_SIZE for mi in noc.messages_instance))
+
+    def test_tracing_off(self):
+        # flits are only traced on request
+        noc = fixture_noc('RR', 'ACTIVITY', fixture_messages(1))
+        noc.env.run(until=400)
+
+        self.assertIsNone(noc.traceset)
+        self.assertFalse(noc.router_matrix[0][0].trace_flits)
+        self.assertEqual(len(noc.messages_instance), 4)
+        self.assertTrue(all(mi.get_latency() > 0 for mi in noc.messages_instance))
+
+
+class TestReleaseCalendar(unittest.TestCase):
+
+    def release(self, scheduling):
+        noc = fixture_noc('RR', scheduling, [Message(1, 100, 320, 30, 100, Coordinate(0, 0), Coordinate(0, 2), 0),
+                                             Message(2, 60, 320, 0, 60, Coordinate(1, 0), Coordinate(1, 2), 1)])
+        noc.env.run(until=250)
+
+        return [(mi.id, mi.instance, mi._depart_time) for mi in noc.messages_instance]
+
+    def test_offset(self):
+        releases = self.release('CYCLE')
+
+        self.assertEqual([(i, instance) for i, instance, _ in releases],
+                         [(2, 0), (1, 0), (2, 1), (2, 2), (1, 1), (2, 3), (1, 2), (2, 4)])
+        self.assertEqual([depart for i, _, depart in releases if i == 1], [30, 130, 230])
+        self.assertEqual(releases, self.release('ACTIVITY'))
+
+
+class TestRunner(unittest.TestCase):
+    CONFIG = "noc:\n  dimension: 3\n  numberOfVC: 2\n  VCBufferSize: 4\n  arbitration: 'PRIORITY_PREEMPT'\n" \
+             "quantum:\n  1: 1\n  2: 1\n"
+    SCENARIO = "scenario:\n  - src:\n      i: 0\n      j: 0\n    dest:\n      i: 2\n      j: 1\n" \
+               "    size: 640\n    offset: 0\n    deadline: 0\n    period: 1000\n"
+
+    def setUp(self):
+        self.root = scenario_directory(self)
+        for name in ['b', 'a']:
+            write_scenario(os.path.join(self.root, name), self.CONFIG, self.SCENARIO)
+        os.mkdir(os.path.join(self.root, 'empty'))
+
+    def test_input_directories(self):
+        self.assertEqual(runner.input_directories(self.root),
+                         [os.path.join(self.root, 'a'), os.path.join(self.root, 'b')])
+
+    def test_parallel_run(self):
+        directories = runner.input_directories(self.root)
+        summary = runner.run(directories, workers=2)
+
+        self.assertEqual([row[0] for row in summary], directories)
+        for directory, row in zip(directories, summary):
+            self.assertEqual(row[1], 'PRIORITY_PREEMPT')
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'result_sim.csv')))
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'result_analysis.csv')))
+
+        runner.summary_trace_csv(os.path.join(self.root, 'summary.csv'), summary)
+        with open(os.path.join(self.root, 'summary.csv')) as file:
+            self.assertEqual(len(file.readlines()), 3)
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = scenario_directory(self, TestRunner.CONFIG, TestRunner.SCENARIO)
+        self.cache = ResultCache(os.path.join(self.root, 'cache'))
+
+    def messages(self):
+        return [Message(1, 150, 896, 0, 100, Coordinate(0, 3), Coordinate(0, 1)),
+                Message(2, 150, 256, 30, 100, Coordinate(2, 0), Coordinate(3, 0))]
+
+    def test_key(self):
+        key = ResultCache.key(4, 4, 10, [1, 1, 1, 1], 'RR', self.messages(), 300)
+        self.assertEqual(ResultCache.key(4, 4, 10, [1, 1, 1, 1], 'RR', self.messages(), 300), key)
+        self.assertNotEqual(ResultCache.key(4, 4, 10, [1, 1, 1, 1], 'PRIORITY_PREEMPT', self.messages(), 300), key)
+        self.assertNotEqual(ResultCache.key(4, 4, 10, [1, 1, 2, 1], 'RR', self.messages(), 300), key)
+
+        messages = self.messages()
+        messages[1].deadline = 120
+        self.assertNotEqual(ResultCache.key(4, 4, 10, [1, 1, 1, 1], 'RR', messages, 300), key)
+
+    def test_store_load(self):
+        messages = self.messages()
+        instances = [MessageInstance(messages[0], 0), MessageInstance(messages[1], 0)]
+        instances[0].set_depart_time(0)
+        instances[0].set_arrival_time(40)
+        instances[1].set_depart_time(30)
+
+        self.assertIsNone(self.cache.load('key', messages))
+        self.cache.store('key', instances)
+        loaded = self.cache.load('key', messages)
+
+        self.assertEqual([(mi.id, mi.instance, mi.get_latency(), mi.is_deadline_met()) for mi in loaded],
+                         [(1, 0, 40, True), (2, 0, -1, None)])
+        # only the times are restored : no packets are built
+        self.assertEqual([mi.packets for mi in loaded], [[], []])
+        self.assertIsNone(ResultCache(self.cache.directory, bypass=True).load('key', messages))
+
+    def test_eviction(self):
+        messages = self.messages()
+        instances = [MessageInstance(messages[0], 0)]
+        for key in ['a', 'b', 'c']:
+            self.cache.store(key, instances)
+        size = os.path.getsize(self.cache.path('a'))
+
+        # 'a' becomes the most recently used entry
+        os.utime(self.cache.path('a'), (1, 1))
+        os.utime(self.cache.path('b'), (2, 2))
+        os.utime(self.cache.path('c'), (3, 3))
+        self.cache.load('a', messages)
+
+        self.cache.max_size = 2 * size
+        self.cache.eviction()
+        self.assertEqual(sorted(os.listdir(self.cache.directory)), ['a.json', 'c.json'])
+
+    def test_runner(self):
+        # the conflict tasks are random : both runs get the same taskset
+        random.seed(0)
+        summary = runner.run([self.root], cache=self.cache)
+        self.assertEqual(len(os.listdir(self.cache.directory)), 1)
+
+        with open(os.path.join(self.root, 'result_sim.csv')) as file:
+            simulated = file.read()
+        os.remove(os.path.join(self.root, 'result_sim.csv'))
+
+        random.seed(0)
+        cached = runner.run([self.root], cache=self.cache)
+        self.assertEqual(cached[0][:-1], summary[0][:-1])
+        self.assertEqual(len(os.listdir(self.cache.directory)), 1)
+        with open(os.path.join(self.root, 'result_sim.csv')) as file:
+            self.assertEqual(file.read(), simulated)
+
+    def test_fail_fast_engines(self):
+        # the array engines ignore failFast : they must not share entries with the fail-fast runs
+        directory = os.path.join(self.root, 'scenario')
+
+        summary = dict()
+        for scheduling in ['ACTIVITY', 'ARRAY', 'ACTIVITY', 'ARRAY']:
+            config = TestRunner.CONFIG.replace("VCBufferSize: 4\n", "VCBufferSize: 10\n  scheduling: '%s'\n"
+                                               "  failFast: true\n" % scheduling)
+            write_scenario(directory, config, "task: 6\nmethod: UuniFast\nload: 0.7\n")
+            row = runner.run([directory], cache=self.cache, seed=2)[0]
+            self.assertEqual(summary.setdefault(scheduling, row)[1:-1], row[1:-1])
+
+        # the fail-fast run stops at its first deadline miss
+        self.assertLess(summary['ACTIVITY'][4], summary['ARRAY'][4])
+        self.assertEqual(len(os.listdir(self.cache.directory)), 2)
+
+
+def seeded_taskset(job):
+    # taskset of a seeded job, as a comparable list
+    directory, seed, index = job
+    generation = Generation(job_random(seed, index))
+    generation.config(os.path.join(directory, 'config.yml'))
+    generation.set_noc(NoC(simpy.Environment(), 'Network-On-Chip', generation.square_size(), generation.nbvc(),
+                           generation.vc_size(), generation.vc_quantum()))
+
+    generation.scenario(os.path.join(directory, 'uunifast.yml'))
+    messages = generation.scenario(os.path.join(directory, 'scenario.yml'))
+    return [(m.id, m.period, m.size, m.offset, m.deadline, m.src.i, m.src.j, m.dest.i, m.dest.j, m.priority)
+            for m in messages]
+
+
+class TestSeeding(unittest.TestCase):
+
+    def setUp(self):
+        self.root = scenario_directory(self, TestRunner.CONFIG, TestRunner.SCENARIO)
+        with open(os.path.join(self.root, 'uunifast.yml'), 'w') as file:
+            file.write("task: 20\nmethod: UuniFast\nload: 0.7\n")
+
+    def test_job_random(self):
+        self.assertEqual(job_random(7, 3).random(), job_random(7, 3).random())
+        self.assertNotEqual(job_random(7, 3).random(), job_random(7, 4).random())
+        self.assertNotEqual(job_random(7, 3).random(), job_random(8, 3).random())
+
+    def test_generation(self):
+        taskset = seeded_taskset((self.root, 7, 0))
+        self.assertGreater(len(taskset), 21)
+        self.assertEqual(seeded_taskset((self.root, 7, 0)), taskset)
+        self.assertNotEqual(seeded_taskset((self.root, 7, 1)), taskset)
+
+    def test_worker_processes(self):
+        jobs = [(self.root, 7, index) for index in range(4)]
+        with multiprocessing.Pool(2) as pool:
+            tasksets = pool.map(seeded_taskset, jobs)
+
+        self.assertEqual(tasksets, [seeded_taskset(job) for job in jobs])
+
+    def test_runner(self):
+        cache = ResultCache(os.path.join(self.root, 'cache'))
+        summary = runner.run([self.root], cache=cache, seed=7)
+        self.assertEqual(runner.run([self.root], workers=2, cache=cache, seed=7)[0][:-1], summary[0][:-1])
+        self.assertEqual(len(os.listdir(cache.directory)), 1)
+
+
+class TestSweep(unittest.TestCase):
+    CONFIG = "noc:\n  dimension: 3\n  numberOfVC: 2\n  VCBufferSize: %d\n  arbitration: '%s'\n" \
+             "  scheduling: 'ACTIVITY'\nquantum:\n  1: 1\n  2: 1\n"
+
+    def setUp(self):
+        self.root = scenario_directory(self)
+        self.configs = []
+        for name, vc_size, arbitration in [('a', 10, 'PRIORITY_PREEMPT'), ('b', 16, 'PRIORITY_PREEMPT'),
+                                           ('c', 10, 'RR')]:
+            self.configs.append(os.path.join(self.root, name + '.yml'))
+            with open(self.configs[-1], 'w') as file:
+                file.write(self.CONFIG % (vc_size, arbitration))
+        self.path = os.path.join(self.root, 'sweep.csv')
+
+    def sweep(self, workers=1):
+        return Sweep(self.configs, [3, 6], [0.2, 0.8], 2, self.path, workers, seed=5)
+
+    def test_load_range(self):
+        self.assertEqual(load_range(0.1, 0.9, 0.2), [0.1, 0.3, 0.5, 0.7, 0.9])
+
+    def test_run(self):
+        sweep = self.sweep()
+        self.assertEqual(sweep.run(), 24)
+        self.assertGreater(sweep.throughput, 0)
+
+        ratios = sweep.ratios()
+        self.assertEqual(len(ratios), 12)
+        self.assertEqual(ratios[0][:4], [self.configs[0], 3, 0.2, 2])
+        for ratio in ratios:
+            self.assertTrue(0 <= ratio[4] <= 1 and 0 <= ratio[5] <= 1)
+
+        # the priority tasksets are delivered
+        self.assertGreater(sum(ratio[5] for ratio in ratios if ratio[0] == self.configs[0]), 0)
+
+        # the settings are checked on the same tasksets
+        rows = sorted(sweep.results())
+        self.assertEqual([row[1:5] for row in rows[:8]], [row[1:5] for row in rows[8:16]])
+        self.assertEqual([row[1:5] for row in rows[:8]], [row[1:5] for row in rows[16:]])
+
+    def test_resume(self):
+        sweep = self.sweep()
+        sweep.run()
+        with open(self.path) as file:
+            content = file.read()
+        rows = sorted(row[:7] for row in sweep.results())
+
+        # interrupted while writing the last row
+        with open(self.path, 'w') as file:
+            file.write(content[:len(content) - 30])
+        self.assertEqual(len(sweep.results()), 23)
+
+        self.assertEqual(self.sweep(workers=2).run(), 1)
+        self.assertEqual(sorted(row[:7] for row in sweep.results()), rows)
+        self.assertEqual(sweep.run(), 0)
+
+
+class TestBatchGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.root = scenario_directory(self, TestRunner.CONFIG)
+        self.generation = Generation(job_random(7, 0))
+        self.generation.config(os.path.join(self.root, 'config.yml'))
+
+    def test_utilizations(self):
+        sets = BatchUnifast(5, 1000, 2, np.random.default_rng(0)).UUniFastDiscard()
+        self.assertEqual(sets.shape, (1000, 5))
+        self.assertTrue(np.allclose(sets.sum(axis=1), 2))
+        self.assertTrue(((sets >= 0) & (sets <= 1)).all())
+
+        self.assertTrue((BatchUnifast(5, 10, 2, np.random.default_rng(3)).UUniFastDiscard() ==
+                         BatchUnifast(5, 10, 2, np.random.default_rng(3)).UUniFastDiscard()).all())
+        self.assertRaises(ValueError, BatchUnifast(2, 10, 2).UUniFastDiscard)
+
+    def test_uunifast_batch(self):
+        parameters = self.generation.uunifast_batch(200, 6, 0.7)
+        self.assertEqual(parameters.shape, (200, 6, 9))
+
+        periods, sizes, offsets, deadlines = parameters[..., 0], parameters[..., 1], parameters[..., 2], \
+            parameters[..., 3]
+        self.assertTrue(np.isin(periods, self.generation.period_array).all())
+        self.assertTrue(np.isin(offsets, self.generation.offset_array).all())
+        self.assertTrue(((sizes > 0) & (sizes <= periods)).all())
+        self.assertTrue(((deadlines >= 0) & (deadlines <= periods + 1)).all())
+
+        # XY routes with a hop on both axes, inside the mesh
+        self.assertTrue(((parameters[..., 4:8] >= 0) & (parameters[..., 4:8] < 3)).all())
+        self.assertTrue((parameters[..., 4:6] != parameters[..., 6:8]).all())
+        self.assertTrue(((parameters[..., 8] >= 0) & (parameters[..., 8] < 2)).all())
+
+        # the same generator seed gives the same batch
+        self.generation.set_random(job_random(7, 0))
+        self.assertTrue((self.generation.uunifast_batch(200, 6, 0.7) == parameters).all())
+
+    def test_taskset(self):
+        parameters = self.generation.uunifast_batch(3, 4, 0.7)
+        messages = self.generation.taskset(parameters[1])
+
+        self.assertEqual([m.id for m in messages], [0, 1, 2, 3])
+        self.assertEqual([[m.period, m.offset, m.deadline, m.src.i, m.src.j, m.dest.i, m.dest.j, m.priority]
+                          for m in messages], np.delete(parameters[1], 1, axis=1).tolist())
+        self.assertEqual(self.generation.hyperperiod(),
+                         functools.reduce(self.generation.lcm, parameters[1, :, 0].tolist(), 1))
+
+    def test_uunifast_priorities(self):
+        # the priorities are drawn among the VCs for the priority arbitrations
+        self.generation.set_noc(NoC(simpy.Environment(), 'Network-On-Chip', 3, 2, 4, [1, 1]))
+        messages = self.generation.uunifast_generate(6, 0.7)
+        self.assertEqual(len(messages), 6)
+        self.assertTrue(all(0 <= message.priority < 2 for message in messages))
+
+
+class TestResourceAugmentation(unittest.TestCase):
+    CONFIG = "noc:\n  dimension: 3\n  numberOfVC: 1\n  VCBufferSize: 10\n  arbitration: 'PRIORITY_PREEMPT'\n" \
+             "quantum:\n  1: 1\n"
+
+    def setUp(self):
+        self.root = scenario_directory(self, self.CONFIG)
+        self.generation = Generation()
+        self.generation.config(os.path.join(self.root, 'config.yml'))
+
+        # a priority level is only served by the VC of the same id
+        self.generation.messages = [Message(i, 500, 320, 0, 500, Coordinate(0, i % 3), Coordinate(2, 2), i)
+                                    for i in range(5)]
+
+    def test_fail_fast(self):
+        env = simpy.Environment()
+        noc = NoC(env, "Network-On-Chip", 3, 1, 10, [1])
+        noc.messages = [Message(1, 500, 320, 0, 5, Coordinate(0, 0), Coordinate(2, 2), 0)]
+        noc.arbitration = 'PRIORITY_PREEMPT'
+        noc.fail_fast_setting()
+
+        self.assertIs(env.run(until=500), noc.deadline_miss)
+        self.assertEqual(noc.deadline_miss.id, 1)
+        self.assertLess(env.now, 500)
+
+    def test_fail_fast_in_flight(self):
+        env = simpy.Environment()
+        noc = NoC(env, "Network-On-Chip", 3, 1, 10, [1], 'ACTIVITY')
+        # priority 1 has no VC : the instance never leaves its PE
+        noc.messages = [Message(1, 500, 320, 20, 50, Coordinate(0, 0), Coordinate(2, 2), 1)]
+        noc.arbitration = 'PRIORITY_PREEMPT'
+        noc.fail_fast_setting()
+
+        self.assertIs(env.run(until=500), noc.messages_instance[0])
+        self.assertEqual(env.now, 70)
+
+    def test_search(self):
+        search = AugmentationSearch(self.generation, self.generation.messages)
+        self.assertEqual(search.search(), 5)
+        self.assertEqual(sorted(search.results.items()),
+                         [(1, False), (2, False), (4, False), (5, True), (6, True), (8, True)])
+
+    def test_parallel_search(self):
+        search = AugmentationSearch(self.generation, self.generation.messages, workers=3)
+        self.assertEqual(search.search(), 5)
+
+
+class TestEventList(unittest.TestCase):
+
+    def setUp(self):
+        self.event_list = EventList()
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 4, 4, 12, [1, 1, 1, 1])
+        self.router = self.noc.router_matrix[0][0]
+
+    def test_next_time(self):
+        self.event_list.push(Event(EventType.ROUTER_CHECK, self.router, 9000))
+        self.event_list.push(Event(EventType.ROUTER_CHECK, self.router, 12))
+        self.event_list.push(Event(EventType.ROUTER_CHECK, self.router, 500))
+
+        self.assertEqual(self.event_list.next_time(0), 12)
+        self.assertEqual(self.event_list.pop(12).time, 12)
+        self.assertIsNone(self.event_list.pop(12))
+        self.assertEqual(self.event_list.next_time(12), 500)
+        self.assertEqual(self.event_list.pop(500).time, 500)
+        self.assertEqual(self.event_list.next_time(500), 9000)
+        self.assertEqual(self.event_list.pop(9000).time, 9000)
+        self.assertIsNone(self.event_list.next_time(9000))
+        self.assertTrue(self.event_list.isEmpty())
+
+    def test_duplicate_election(self):
+        self.event_list.push(Event(EventType.VC_ELECTION, self.router, 3))
+        self.event_list.push(Event(EventType.VC_ELECTION, self.router, 3))
+        self.event_list.push(Event(EventType.VC_ELECTION, self.noc.router_matrix[0][1], 3))
+
+        self.assertEqual(len(self.event_list.pull(3)), 2)
+
+        # the election is allowed again once the pending one is consumed
+        self.event_list.pop(3)
+        self.event_list.pop(3)
+        self.event_list.push(Event(EventType.VC_ELECTION, self.router, 3))
+        self.assertEqual(len(self.event_list.pull(3)), 1)
+
+    def test_duplicate_send_flit(self):
+        entity = {'router': self.router, 'vc': self.router.inPE.vcs[0], 'outport': self.router.outEast}
+        self.event_list.push(Event(EventType.SEND_FLIT, entity, 7))
+        self.event_list.push(Event(EventType.SEND_FLIT, dict(entity), 7))
+
+        self.assertEqual(len(self.event_list.pull(7)), 1)
+
+
+def random_taskset(generator, square_size, number):
+    # messages between random distinct routers, deadlines at the period
+    messages = []
+    for counter in range(number):
+        src = Coordinate(generator.randrange(square_size), generator.randrange(square_size))
+        dest = src
+        while dest.i == src.i and dest.j == src.j:
+            dest = Coordinate(generator.randrange(square_size), generator.randrange(square_size))
+        period = generator.choice([100, 150, 200, 300, 600])
+        messages.append(Message(counter + 1, period, generator.choice([256, 640, 960, 1600]), 0, period, src, dest))
+    return messages
+
+
+class AnalysisTestCase(unittest.TestCase):
+    # 4x4 mesh and taskset of the analysis tests
+
+    def setUp(self):
+        self.noc = NoC(simpy.Environment(), "Network-On-Chip", 4, 4, 12, [1, 1, 1, 1])
+        self.messages = [Message(1, 150, 896, 0, 100, Coordinate(0, 3), Coordinate(0, 1)),
+                         Message(2, 150, 256, 0, 100, Coordinate(2, 0), Coordinate(3, 0)),
+                         Message(3, 400, 256, 0, 300, Coordinate(0, 2), Coordinate(3, 0)),
+                         Message(4, 600, 256, 0, 550, Coordinate(2, 0), Coordinate(3, 0)),
+                         Message(5, 300, 3072, 0, 250, Coordinate(0, 1), Coordinate(2, 0)),
+                         Message(6, 300, 640, 0, 250, Coordinate(0, 0), Coordinate(3, 1)),
+                         Message(7, 300, 640, 0, 250, Coordinate(1, 3), Coordinate(1, 0))]
+
+
+class TestInterferenceIndex(AnalysisTestCase):
+
+    def setUp(self):
+        AnalysisTestCase.setUp(self)
+        self.qinModel = QinModel(self.noc, self.messages)
+
+    def direct(self, message):
+        # pairwise link comparison
+        return [msg for msg in self.messages if msg is not message and msg.id >= message.id and
+                self.qinModel.task_overlap(message.get_xy_path_coordinate(self.noc),
+                                           msg.get_xy_path_coordinate(self.noc))]
+
+    def indirect(self, message):
+        direct = self.direct(message)
+        return [task for msg in direct for task in self.direct(msg) if task not in direct]
+
+    def test_interference_sets(self):
+        for message in self.messages:
+            self.assertEqual(self.qinModel.direct_interference_set(message), self.direct(message))
+            self.assertEqual(self.qinModel.indirect_interference_set(message), self.indirect(message))
+
+    def test_latency_0th(self):
+        for message in self.messages:
+            latency = message.basic_network_latency(self.noc)
+            for task in self.direct(message):
+                latency += task.basic_network_latency(self.noc)
+                latency += sum(indirect.basic_network_latency(self.noc) for indirect in self.indirect(task))
+
+            self.assertEqual(self.qinModel.latency_0th(message), latency)
+
+
+class TestIncrementalAnalysis(AnalysisTestCase):
+
+    def assertFromScratch(self, analysis):
+        qinModel = QinModel(self.noc, list(analysis.taskset))
+        for message in analysis.taskset:
+            self.assertEqual(analysis.direct_interference_set(message), qinModel.direct_interference_set(message))
+            self.assertEqual(analysis.response_time(message), qinModel.latency_nth(message))
+
+    def test_add_remove(self):
+        analysis = IncrementalQinModel(self.noc)
+        for message in self.messages:
+            analysis.add_task(message)
+            self.assertFromScratch(analysis)
+
+        for message in [self.messages[2], self.messages[0], self.messages[5]]:
+            analysis.remove_task(message)
+            self.assertFromScratch(analysis)
+
+        analysis.add_task(self.messages[0])
+        self.assertFromScratch(analysis)
+
+    def test_admission(self):
+        analysis = IncrementalQinModel(self.noc, self.messages[1:])
+        self.assertTrue(analysis.is_schedulable())
+
+        # a long message on shared links makes the taskset unschedulable
+        message = Message(0, 150, 8192, 0, 100, Coordinate(0, 0), Coordinate(3, 0))
+        self.assertFalse(analysis.admission(message))
+        self.assertNotIn(message, analysis.taskset)
+        self.assertTrue(analysis.is_schedulable())
+        self.assertFromScratch(analysis)
+
+        self.assertTrue(analysis.admission(self.messages[0]))
+        self.assertIn(self.messages[0], analysis.taskset)
+        self.assertFromScratch(analysis)
+
+    def test_random_tasksets(self):
+        generator = random.Random(11)
+        for square_size in [3, 4, 6]:
+            self.noc = NoC(simpy.Environment(), "Network-On-Chip", square_size, 4, 12, [1, 1, 1, 1])
+            messages = random_taskset(generator, square_size, 12)
+
+            analysis = IncrementalQinModel(self.noc)
+            for message in generator.sample(messages, len(messages)):
+                analysis.add_task(message)
+            self.assertFromScratch(analysis)
+
+            for message in generator.sample(messages, 4):
+                analysis.remove_task(message)
+            self.assertFromScratch(analysis)
+
+
+class TestBatchLatency(AnalysisTestCase):
+
+    def test_qin_model(self):
+        qinModel = QinModel(self.noc, self.messages)
+        batch = BatchQinModel(self.noc, self.messages)
+
+        self.assertEqual(batch.latency_0th().tolist(), [qinModel.latency_0th(msg) for msg in self.messages])
+        self.assertEqual(batch.latency_nth().tolist(), [qinModel.latency_nth(msg) for msg in self.messages])
+
+    def test_fixed_point(self):
+        messages = [Message(1, 1000, 640, 0, 1000, Coordinate(0, 0), Coordinate(0, 3)),
+                    Message(2, 20, 320, 0, 20, Coordinate(0, 1), Coordinate(0, 2))]
+        batch = BatchQinModel(self.noc, messages)
+
+        # 34 -> 23 + 2 * 11 -> 23 + 3 * 11 -> 23 + 3 * 11
+        self.assertEqual(batch.latency_0th().tolist(), [34, 11])
+        self.assertEqual(batch.latency_nth().tolist(), [45, 11])
+        self.assertEqual(batch.latency_nth().tolist(),
+                         [QinModel(self.noc, messages).latency_nth(msg) for msg in messages])
+        self.assertEqual(batch.latency_nth(iterations=None).tolist(), [56, 11])
+
+    def test_tdma(self):
+        tdma = TDMA(self.noc, [1, 2, 1, 1])
+        batch = BatchTDMA(self.noc, [1, 2, 1, 1])
+
+        self.assertEqual(batch.latency(self.messages, 2).tolist(), [tdma.latency(msg, 2) for msg in self.messages])
+
+    def test_random_tasksets(self):
+        generator = random.Random(5)
+        for square_size, number in [(3, 8), (4, 20), (6, 40), (8, 60)]:
+            noc = NoC(simpy.Environment(), "Network-On-Chip", square_size, 4, 12, [1, 1, 1, 1])
+            messages = random_taskset(generator, square_size, number)
+            qinModel = QinModel(noc, messages)
+            batch = BatchQinModel(noc, messages)
+
+            self.assertEqual(batch.latency_0th().tolist(), [qinModel.latency_0th(msg) for msg in messages])
+            self.assertEqual(batch.latency_nth().tolist(), [qinModel.latency_nth(msg) for msg in messages])
+
+
 class TestAnalysisTool(unittest.TestCase):
 
     def setUp(self):